@@ -1,9 +1,51 @@
-from . import locals
-from .buttons import Button, IconButton, SlideBar
-from .text import SimpleText, LaText, InLineTextBox, InLinePassBox
-from .font import DEFAULT_FONT, Font
-from .vracabulous import Separator, Window, FocusSelector, FPSIndicator
-from .draw import line, circle, ring, polygon
-from .math import V2, comb, fact, merge_rects
-from .geo import Rectangle, Point, Bezier
-from .colors import mix, bw_contrasted
+"""
+Widgets and helpers for pygame.
+
+The submodules and the names below are imported the first time they are used, so importing
+GUI.locals, GUI.colors or GUI.math does not load pygame fonts, images and the other widgets.
+"""
+
+import sys
+from importlib import import_module
+
+# name -> the submodule where it is defined
+_EXPORTS = {
+    'Button': 'buttons', 'IconButton': 'buttons', 'SlideBar': 'buttons',
+    'SimpleText': 'text', 'LaText': 'text', 'InLineTextBox': 'text', 'InLinePassBox': 'text', 'TextArea': 'text',
+    'LogView': 'logview',
+    'DEFAULT_FONT': 'font', 'Font': 'font',
+    'Separator': 'vracabulous', 'Window': 'vracabulous', 'FocusSelector': 'vracabulous',
+    'FPSIndicator': 'vracabulous',
+    'line': 'draw', 'circle': 'draw', 'ring': 'draw', 'polygon': 'draw',
+    'V2': 'math', 'comb': 'math', 'fact': 'math', 'merge_rects': 'math',
+    'Rectangle': 'geo', 'Point': 'geo', 'Bezier': 'geo',
+    'mix': 'colors', 'bw_contrasted': 'colors',
+}
+
+
+def __getattr__(name):
+    if name in _EXPORTS:
+        value = getattr(import_module('.' + _EXPORTS[name], __name__), name)
+    else:
+        try:
+            value = import_module('.' + name, __name__)
+        except ModuleNotFoundError as e:
+            if e.name != __name__ + '.' + name:
+                raise
+            raise AttributeError('module {!r} has no attribute {!r}'.format(__name__, name)) from None
+
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_EXPORTS))
+
+
+if sys.version_info < (3, 7):
+    # no module __getattr__ before python 3.7
+    for _name in _EXPORTS:
+        __getattr__(_name)
+    __getattr__('locals')
+
+__all__ = sorted(_EXPORTS)
@@ -0,0 +1,116 @@
+# coding=utf-8
+
+"""
+Images loaded once and shared by the widgets.
+
+An image is kept for each (path, size, effect): the file is decoded once, scaled once per size and
+each effect of GUI.filters is applied once. The surfaces are shared, so they must not be drawn on.
+"""
+
+import json
+import os
+from threading import Thread
+
+import pygame
+
+from GUI import filters
+from GUI.cache import LRUCache
+
+# (path, size, effect) -> surface
+image_cache = LRUCache(32 * 2 ** 20)
+
+
+def _key(path, size=None, effect=None):
+    if size is not None:
+        size = tuple(int(x) for x in size)
+    if effect is not None:
+        effect = tuple(effect)
+    return os.path.abspath(path), size, effect
+
+
+def is_path(path):
+    """Return True if path is a file path, whose images are shared, and not a file object or a surface."""
+    return isinstance(path, (str, bytes)) or hasattr(path, '__fspath__')
+
+
+def _convert(surf):
+    """The surface in the pixel format of the display, that is faster to blit, if there is one."""
+    if pygame.display.get_surface() is None:
+        return surf
+    if surf.get_flags() & pygame.SRCALPHA or surf.get_colorkey() is not None:
+        return surf.convert_alpha()
+    return surf.convert()
+
+
+def _resize(image, size):
+    if size is None or image.get_size() == size:
+        return image
+    return pygame.transform.smoothscale(image, size)
+
+
+def _apply(image, effect):
+    name, *args = effect
+    return getattr(filters, name)(image, *args)
+
+
+def _make(key):
+    path, size, effect = key
+
+    if effect is not None:
+        return _apply(load(path, size), effect)
+
+    if size is not None:
+        return _resize(load(path), size)
+
+    return _convert(pygame.image.load(path))
+
+
+def load(path, size=None, effect=None):
+    """
+    Return the shared image of a file.
+
+    :param path: the path of the image file. A file object or a surface is also accepted, but its image is not shared
+    :param size: the size of the image, or None for the size of the file
+    :param effect: None, or the name of a function of GUI.filters and its arguments, like ('brightness', 0.8)
+    """
+
+    if not is_path(path):
+        # a file object can be read only once and two of them can't be compared, so it is not cached
+        _, size, effect = _key('', size, effect)
+        image = path if isinstance(path, pygame.Surface) else _convert(pygame.image.load(path))
+        image = _resize(image, size)
+        return image if effect is None else _apply(image, effect)
+
+    key = _key(path, size, effect)
+    return image_cache.get_or_create(key, lambda: _make(key))
+
+
+def warm(manifest, background=True):
+    """
+    Load images in advance, so the widgets find them in the cache.
+
+    :param manifest: a list of paths or (path, size, effect), or the path of a json file with such a list
+    :param background: load them in a thread, which is returned
+    """
+
+    if isinstance(manifest, str):
+        with open(manifest) as f:
+            manifest = json.load(f)
+
+    def load_all():
+        for entry in manifest:
+            if isinstance(entry, str):
+                load(entry)
+            else:
+                load(*entry)
+
+    if not background:
+        load_all()
+        return None
+
+    thread = Thread(target=load_all, name='GUI assets warm up', daemon=True)
+    thread.start()
+    return thread
+
+
+__all__ = ['load', 'warm', 'is_path', 'image_cache']
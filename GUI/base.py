@@ -8,10 +8,62 @@ To create any new widget, you must extend BaseWidget.
 """
 
 import pygame
+from weakref import WeakValueDictionary
 
+from GUI import reactive
+from GUI.reactive import CLEAN, DIRTY, Tracker, is_polled, track
 from GUI.locals import CENTER, TOPLEFT, TOPRIGHT, MIDTOP, MIDLEFT, MIDRIGHT, BOTTOMRIGHT, MIDBOTTOM, BOTTOMLEFT
 from pygame.event import EventType
 
+# attributes of the widget that depends on its pos, size and anchor
+_GEOMETRY_ATTRS = frozenset("x y top left bottom right topleft bottomleft topright bottomright midtop midleft "
+                            "midbottom midright center centerx centery width height w h size pos anchor".split())
+
+# the current frame, None when no frame clock is running
+_frame = None
+
+# the widgets that have the focus
+_focused = WeakValueDictionary()
+
+_MISSING = object()
+
+
+def _same(value, other):
+    """Return True if the two values are known to be equal."""
+    if value is other:
+        return True
+    try:
+        return bool(value == other)
+    except (TypeError, ValueError):
+        return False
+
+
+def new_frame():
+    """
+    Start a new frame.
+
+    Once the frames are started, a widget resolves its pos, size and anchor at most once per frame
+    and every other read of its geometry is a simple lookup. The Window calls this before each update.
+    """
+    global _frame
+    _frame = 0 if _frame is None else _frame + 1
+
+
+def current_frame():
+    """Return the number of the current frame, or None if the frame clock is not running."""
+    return _frame
+
+
+def reset_frames():
+    """Stop the frame clock, the widgets will resolve their geometry on every read again."""
+    global _frame
+    _frame = None
+
+
+def focused_widgets():
+    """Return the widgets that currently have the focus."""
+    return list(_focused.values())
+
 
 class BaseWidget(pygame.Rect):
     """
@@ -19,8 +71,27 @@ class BaseWidget(pygame.Rect):
 
     The position of the widget (returned by .pos()) is always the coord at the anchor,
         even if the anchor changes. Every other position attribute is calculated according to this position
+
+    When the frame clock runs (see new_frame()), the geometry is cached for the whole frame.
+    Call invalidate() if something the callbacks depend on changes in the middle of a frame.
+
+    Callbacks wrapped in GUI.reactive.computed are not evaluated each frame, but only when one of the widgets
+    or modifiers they read changes.
+
+    Setting an attribute to a new value marks the widget as needing to be redrawn (see needs_redraw()).
     """
 
+    _needs_redraw = True
+
+    # node of the dependency graph, see GUI.reactive
+    _state = DIRTY
+    _version = 0
+    _deps = {}
+    _polled = True  # one of the callbacks must be evaluated each frame
+    _volatile = True  # the geometry must be checked each frame
+    _resolving = False
+    _epoch = None  # the frame in which the geometry was last resolved
+
     def __init__(self, pos, size, anchor=CENTER):
         """
         Creates a Basic Widget with... nothing
@@ -33,9 +104,11 @@ class BaseWidget(pygame.Rect):
 
         super().__init__((0, 0), (0, 0))
 
+        self._dependents = WeakValueDictionary()
         self._anchor = anchor
         self._pos = pos
         self._size = size
+        self._geometry = None  # the resolved (anchor, pos, size)
         self._focus = False
         self.clicked = False
 
@@ -52,19 +125,16 @@ class BaseWidget(pygame.Rect):
     def __getattribute__(self, item):
 
         # we need to update the attrs in case they are defined with a callback
-        # so all have the right value at anytime
-        # TODO : cache them for the whole frame, so there wont be unnecessary calls
+        # so all have the right value at anytime, but only when they may have changed
+        if item in _GEOMETRY_ATTRS:
+            get = object.__getattribute__
+            if get(self, '_state') or get(self, '_volatile') and (_frame is None or get(self, '_epoch') != _frame):
+                get(self, '_refresh')()
 
-        # positions
-        if item in "x y top left bottom right topleft bottomleft topright bottomright midtop midleft midbottom " \
-                   "midright center centerx centery".split():
-            self.__update()
+            if reactive._trackers:
+                track(self)
 
-        # size
-        if item in "width height w h".split():
-            self.__update()
-
-        return super(BaseWidget, self).__getattribute__(item)
+        return object.__getattribute__(self, item)
 
     def __setattr__(self, key, value):
         if key in (TOPLEFT, BOTTOMLEFT, TOPRIGHT, BOTTOMRIGHT, MIDTOP, MIDLEFT, MIDBOTTOM, MIDRIGHT, CENTER):
@@ -77,19 +147,84 @@ class BaseWidget(pygame.Rect):
         elif key in ('x', 'y', 'top', 'left', 'bottom', 'right', 'centerx', 'centery'):
             raise AttributeError("Can't set the attribute")
 
+        elif key == '_focus':
+            if value:
+                _focused[id(self)] = self
+            else:
+                _focused.pop(id(self), None)
+            super(BaseWidget, self).__setattr__(key, value)
+            super(BaseWidget, self).__setattr__('_needs_redraw', True)
+
         else:
+            last_value = self.__dict__.get(key, _MISSING)
             super(BaseWidget, self).__setattr__(key, value)
 
+            if key != '_needs_redraw' and not _same(last_value, value):
+                super(BaseWidget, self).__setattr__('_needs_redraw', True)
+
+    def _refresh(self):
+        """Bring the geometry up to date, if one of the callbacks or the things they depend on changed."""
+
+        if self._resolving:
+            return
+
+        stale_frame = self._volatile and (_frame is None or self._epoch != _frame)
+        if self._state == CLEAN and not stale_frame:
+            return
+
+        self._set('_resolving', True)
+        try:
+            if self._state == DIRTY or stale_frame and self._polled or reactive.changed(self._deps):
+                self.__update()
+        finally:
+            self._set('_resolving', False)
+
+        self._set('_state', CLEAN)
+        self._set('_epoch', _frame)
+
     def __update(self):
         """
-        This is called each time an attribute is asked, to be sure every params are updated, beceause of callbacks.
+        Evaluate the pos, size and anchor and update the rect.
+
+        Everything the callbacks read is recorded, so we know when they must be evaluated again.
         """
 
+        with Tracker() as tracker:
+            anchor = self._anchor() if callable(self._anchor) else self._anchor
+            pos = self._pos() if callable(self._pos) else self._pos
+            size = self._size() if callable(self._size) else self._size
+
         # I can not set the size attr because it is my property, so I set the width and height separately
-        width, height = self.size
-        super(BaseWidget, self).__setattr__("width", width)
-        super(BaseWidget, self).__setattr__("height", height)
-        super(BaseWidget, self).__setattr__(self.anchor, self.pos)
+        self._set("width", size[0])
+        self._set("height", size[1])
+        self._set(anchor, pos)
+
+        geometry = anchor, pos, size
+        if geometry != self._geometry:
+            self._set("_geometry", geometry)
+            self._set("_version", self._version + 1)
+
+        tracker.deps.pop(id(self), None)
+        reactive.subscribe(self, self._deps, tracker.deps)
+        self._set("_deps", tracker.deps)
+        self._set("_polled", any(is_polled(v) for v in (self._anchor, self._pos, self._size)))
+        self._set("_volatile", self._polled or tracker.volatile)
+
+    def _set(self, key, value):
+        """Set an attribute of the rect, bypassing the checks of __setattr__."""
+        super(BaseWidget, self).__setattr__(key, value)
+
+    def _mark(self, state):
+        """Mark the geometry as stale. Return False if it was already."""
+        if self._state >= state:
+            return False
+        self._set('_state', state)
+        return True
+
+    def invalidate(self):
+        """Force the widget to resolve again its pos, size and anchor the next time they are read."""
+        self._mark(DIRTY)
+        reactive.invalidate(self)
 
     @staticmethod
     def __verify(pos_or_size):
@@ -106,9 +241,7 @@ class BaseWidget(pygame.Rect):
 
     @property
     def pos(self):
-        if callable(self._pos):
-            return self._pos()
-        return self._pos
+        return self._geometry[1]
 
     @pos.setter
     def pos(self, value):
@@ -118,13 +251,15 @@ class BaseWidget(pygame.Rect):
             if len(value) != 2:
                 raise ValueError("The pos must be a callable that returns 2-tuples or a 2-tuple")
 
+        if value is self._pos or not callable(value) and value == self._pos:
+            return
+
         self._pos = value
+        self.invalidate()
 
     @property
     def size(self):
-        if callable(self._size):
-            return self._size()
-        return self._size
+        return self._geometry[2]
 
     @size.setter
     def size(self, value):
@@ -134,13 +269,15 @@ class BaseWidget(pygame.Rect):
             if len(value) != 2:
                 raise ValueError("The size must be a callable that returns 2-tuples or a 2-tuple")
 
+        if value is self._size or not callable(value) and value == self._size:
+            return
+
         self._size = value
+        self.invalidate()
 
     @property
     def anchor(self):
-        if callable(self._anchor):
-            return self._anchor()
-        return self._anchor
+        return self._geometry[0]
 
     @anchor.setter
     def anchor(self, value):
@@ -148,7 +285,19 @@ class BaseWidget(pygame.Rect):
             if value not in (TOPLEFT, TOPRIGHT, MIDTOP, MIDLEFT, MIDRIGHT, CENTER, BOTTOMRIGHT, MIDBOTTOM, BOTTOMLEFT):
                 raise ValueError
 
+        if value is self._anchor or not callable(value) and value == self._anchor:
+            return
+
         self._anchor = value
+        self.invalidate()
+
+    def redraw(self):
+        """Tell that the widget looks different and must be drawn again."""
+        self._needs_redraw = True
+
+    def needs_redraw(self):
+        """Return True if the widget changed since it was last drawn by a Window."""
+        return self._needs_redraw
 
     def focus(self):
         """Gives the focus to the widget."""
@@ -181,6 +330,6 @@ class BaseWidget(pygame.Rect):
         raise NotImplementedError
 
 
-__all__ = ['BaseWidget']
+__all__ = ['BaseWidget', 'new_frame', 'current_frame', 'reset_frames', 'focused_widgets']
 
 if __name__ == '__main__': help(BaseWidget)
@@ -8,12 +8,13 @@ from time import time, sleep
 
 from pygame.constants import MOUSEBUTTONDOWN, MOUSEBUTTONUP, MOUSEMOTION
 
+from GUI import assets
 from GUI.base import BaseWidget
 from GUI.colors import bw_contrasted, mix
 from GUI.draw import circle, roundrect
 from GUI.font import Font
 from GUI.locals import CENTER, BLUE, LIGHT_GREY, BLACK, ORANGE, GREEN
-from GUI.text import SimpleText
+from GUI.text import SimpleText, TextSource
 from GUI.vracabulous import Separator
 
 
@@ -38,6 +39,7 @@ class BaseButton(BaseWidget):
         super().__init__(pos, size, anchor)
         self.func = func
         self.flags = flags
+        self.hovered = False
 
     def click(self, force_no_call=False, milis=None):
         """
@@ -81,6 +83,22 @@ class BaseButton(BaseWidget):
             else:
                 self.func()
 
+    def update(self, event_or_list):
+        """Update the button with the events: press, release and hover."""
+
+        for e in super().update(event_or_list):
+            if e.type == MOUSEBUTTONDOWN:
+                if e.pos in self:
+                    self.click()
+                else:
+                    self.release(force_no_call=True)
+
+            elif e.type == MOUSEBUTTONUP:
+                self.release(force_no_call=e.pos not in self)
+
+            elif e.type == MOUSEMOTION:
+                self.hovered = e.pos in self
+
     def render(self, surf):
         raise NotImplementedError
 
@@ -109,11 +127,11 @@ class Button(BaseButton):
         super().__init__(func, pos, size, anchor, flags)
 
         self.color = color
-        self.hovered = False
         self.hover_enabled = True
         self.pressed = False
-        self.text = SimpleText(text, lambda: self.center, bw_contrasted(self.color), self.color,
-                               Font(self.height - 6, unit=Font.PIXEL))
+        # the caption moves with the colored part, which depends on the state, so it is polled each frame
+        self.text = SimpleText(text, lambda: self.center + self._front_delta, bw_contrasted(self.color), self.color,
+                               Font.get(self.height - 6, unit=Font.PIXEL))
 
     def _get_color(self):
         """Return the color of the button, depending on its state"""
@@ -163,25 +181,6 @@ class Button(BaseButton):
 
         return Separator(delta, delta)
 
-    def update(self, event_or_list):
-        """Update the button with the events."""
-
-        for e in super().update(event_or_list):
-            if e.type == MOUSEBUTTONDOWN:
-                if e.pos in self:
-                    self.click()
-                else:
-                    self.release(force_no_call=True)
-
-            elif e.type == MOUSEBUTTONUP:
-                self.release(force_no_call=e.pos not in self)
-
-            elif e.type == MOUSEMOTION:
-                if e.pos in self:
-                    self.hovered = True
-                else:
-                    self.hovered = False
-
     def render(self, surf):
         """Render the button on a surface."""
         pos, size = self.topleft, self.size
@@ -197,7 +196,6 @@ class Button(BaseButton):
         else:
             roundrect(surf, (pos + self._front_delta, size), self._get_color(), 5)
 
-        self.text.center = self.center + self._front_delta
         self.text.render(surf)
 
 
@@ -205,8 +203,8 @@ class RoundButton(Button):
     def __init__(self, func, pos, radius: int, text='', color=GREEN, anchor=CENTER, flags=0):
         super().__init__(func, pos, (radius * 2, radius * 2), text, color, anchor, flags)
 
-        self.text = SimpleText(text, lambda: self.center, bw_contrasted(self.color), self.color,
-                               Font(self.height // 2, unit=Font.PIXEL))
+        self.text = SimpleText(text, lambda: self.center + self._front_delta, bw_contrasted(self.color), self.color,
+                               Font.get(self.height // 2, unit=Font.PIXEL))
 
     def render(self, surf):
         """Draw the button on the surface."""
@@ -214,13 +212,16 @@ class RoundButton(Button):
             circle(surf, self.center + self._bg_delta, self.width / 2, LIGHT_GREY)
         circle(surf, self.center + self._front_delta, self.width / 2, self._get_color())
 
-        self.text.center = self.center + self._front_delta
         self.text.render(surf)
 
 
 class IconButton(BaseButton):
     """A button with a **square** icon intead of a text."""
 
+    # the brightness of the icon when the button is pressed and under the mouse
+    PRESSED_BRIGHTNESS = 0.8
+    HOVER_BRIGHTNESS = 1.1
+
     def __init__(self, func, pos, size: int, icon_path, anchor=CENTER):
         """
         Creates an IconButton.
@@ -235,32 +236,25 @@ class IconButton(BaseButton):
         # making the rect a square
         super().__init__(func, pos, (size, size), anchor)
 
-        icon = pygame.image.load(icon_path)
-        icon = pygame.transform.smoothscale(icon, self.size)
-
-        self.icon = icon
+        # the images are shared by all the buttons with the same icon and size
+        self.icon_path = icon_path
+        self.icon = assets.load(icon_path, self.size)
+        # what the effects are applied on: a file object can be read only once, so it is the icon
+        self._icon_source = icon_path if assets.is_path(icon_path) else self.icon
         self.icon_pressed = self.get_darker_image()
+        self.icon_hovered = assets.load(self._icon_source, self.size, ('brightness', self.HOVER_BRIGHTNESS))
 
     def get_darker_image(self):
-        """Returns an icon 80% more dark"""
-        icon_pressed = self.icon.copy()
-
-        for x in range(self.w):
-            for y in range(self.h):
-                r, g, b, *_ = tuple(self.icon.get_at((x, y)))
-                const = 0.8
-                r = int(const * r)
-                g = int(const * g)
-                b = int(const * b)
-                icon_pressed.set_at((x, y), (r, g, b))
-
-        return icon_pressed
+        """Returns the icon 20% darker, with the same transparency."""
+        return assets.load(self._icon_source, self.size, ('brightness', self.PRESSED_BRIGHTNESS))
 
     def render(self, surf):
         """Render the button"""
 
         if self.clicked:
             icon = self.icon_pressed
+        elif self.hovered:
+            icon = self.icon_hovered
         else:
             icon = self.icon
 
@@ -311,8 +305,11 @@ class SlideBar(BaseWidget):
         self.rounding = rounding
         self.v_type = v_type
 
-        font = Font(self.height // 2)
-        self.text_val = SimpleText(self.get, lambda: (self.value_px, self.centery), bw_contrasted(self.color), font)
+        font = Font.get(self.height // 2)
+        # the label is only evaluated and rendered again when the value changes
+        self._label = TextSource(self.get)
+        self.text_val = SimpleText(self._label, lambda: (self.value_px, self.centery), bw_contrasted(self.color),
+                                   font=font)
 
         self.interval = interval
 
@@ -328,6 +325,7 @@ class SlideBar(BaseWidget):
         """Set the value of the bar. If the value is out of bound, sets it to an extremum"""
         value = min(self.max, max(self.min, value))
         self._value = value
+        self._label.invalidate()
         start_new_thread(self.func, (self.get(),))
 
     def _start(self):
@@ -371,6 +369,7 @@ class SlideBar(BaseWidget):
         prop = delta_x / self.width
         real = prop * (self.max - self.min)
         self._value = self.min + round(real / self.step) * self.step
+        self._label.invalidate()
 
     def render(self, display):
         """Renders the bar on the display"""
@@ -0,0 +1,135 @@
+# coding=utf-8
+
+"""
+A memory bounded cache for surfaces and other expensive objects.
+
+The least recently used items are dropped when the cache uses more bytes than its budget.
+"""
+
+from collections import OrderedDict
+from threading import RLock
+
+
+def surface_bytes(surf):
+    """Return the number of bytes used by the pixels of a surface."""
+    return surf.get_pitch() * surf.get_height()
+
+
+class LRUCache:
+    """A least recently used cache, with a budget in bytes and hit/miss/eviction counters."""
+
+    def __init__(self, max_bytes=16 * 2 ** 20, sizeof=surface_bytes):
+        """
+        Creates an empty cache.
+
+        :param max_bytes: the maximum number of bytes the items can use together
+        :param sizeof: a function that returns the size in bytes of an item
+        """
+
+        self._items = OrderedDict()  # key -> (value, size)
+        self._lock = RLock()
+        self._max_bytes = max_bytes
+        self.sizeof = sizeof
+        self.bytes = 0
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __repr__(self):
+        return '<LRUCache({} items, {}/{} bytes)>'.format(len(self), self.bytes, self.max_bytes)
+
+    def __len__(self):
+        return len(self._items)
+
+    def __contains__(self, key):
+        return key in self._items
+
+    @property
+    def max_bytes(self):
+        """The memory budget of the cache."""
+        return self._max_bytes
+
+    @max_bytes.setter
+    def max_bytes(self, value):
+        with self._lock:
+            self._max_bytes = value
+            self._evict()
+
+    def get(self, key, default=None):
+        """Return the item stored with this key, or default if there is none."""
+        with self._lock:
+            try:
+                value, _ = self._items[key]
+            except KeyError:
+                self.misses += 1
+                return default
+
+            self._items.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key, value):
+        """Store an item in the cache. Items bigger than the whole budget are not stored."""
+        size = self.sizeof(value)
+
+        with self._lock:
+            if key in self._items:
+                self.bytes -= self._items.pop(key)[1]
+
+            if size > self._max_bytes:
+                return value
+
+            self._items[key] = value, size
+            self.bytes += size
+            self._evict()
+
+        return value
+
+    def get_or_create(self, key, factory):
+        """Return the item stored with this key, or create it with factory() and store it."""
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            value = self.put(key, factory())
+        return value
+
+    def discard(self, key):
+        """Remove an item from the cache, if it is there."""
+        with self._lock:
+            if key in self._items:
+                self.bytes -= self._items.pop(key)[1]
+
+    def clear(self):
+        """Remove every item of the cache. The counters are kept."""
+        with self._lock:
+            self._items.clear()
+            self.bytes = 0
+
+    def _evict(self):
+        while self.bytes > self._max_bytes:
+            _, (_, size) = self._items.popitem(last=False)
+            self.bytes -= size
+            self.evictions += 1
+
+    def hit_rate(self):
+        """The proportion of get() that found their item."""
+        total = self.hits + self.misses
+        return self.hits / total if total else 0
+
+    def stats(self):
+        """Return a dict with the counters and the memory used by the cache."""
+        return {
+            'items': len(self),
+            'bytes': self.bytes,
+            'max_bytes': self.max_bytes,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'hit_rate': self.hit_rate(),
+        }
+
+
+_MISSING = object()
+
+
+__all__ = ['LRUCache', 'surface_bytes']
@@ -3,15 +3,43 @@
 """
 This is a module for easy drawings.
 Every function provides anti-aliased shapes.
+
+Circles, rings and round rectangles are rasterized once in a sprite, kept in `sprite_cache`,
+so drawing the same shape again is a single blit.
 """
 
+from math import pi, cos, sin, hypot, floor, ceil
+
 import pygame
 from pygame import gfxdraw
 
-from pygame.constants import SRCALPHA, BLEND_RGBA_MAX, BLEND_RGBA_MIN
+from pygame.constants import SRCALPHA, BLEND_RGBA_MAX, BLEND_RGBA_MIN, BLEND_RGBA_MULT
+
+try:
+    import numpy
+except ImportError:  # the drawings are slower to create without numpy, but they are cached anyway
+    numpy = None
+
+from GUI.cache import LRUCache
+from GUI.locals import BLACK, ROUNDED, FLAT, PIXEL, PERCENT, MITER
+
+# miter joins longer than MITER_LIMIT * width / 2 are drawn as bevel joins
+MITER_LIMIT = 4
+
+# pre-rasterized shapes, keyed by their parameters
+sprite_cache = LRUCache(8 * 2 ** 20)
 
-from GUI.math import V2, merge_rects
-from GUI.locals import BLACK, ROUNDED, FLAT, PIXEL, PERCENT
+
+def _color_key(color):
+    return tuple(color)
+
+
+def _new_sprite(size, color):
+    """A transparent surface to draw a shape on."""
+    sprite = pygame.Surface(size, SRCALPHA)
+    # the transparent pixels have the shape color, so the antialiasing blends with it and not with black
+    sprite.fill(_color_key(color)[:3] + (0,))
+    return sprite
 
 
 def line(surf, start, end, color=BLACK, width=1, style=FLAT):
@@ -22,34 +50,94 @@ def line(surf, start, end, color=BLACK, width=1, style=FLAT):
         # return pygame.draw.aaline(surf, color, start, end)
         return gfxdraw.line(surf, *start, *end, color)
 
-    start = V2(*start)
-    end = V2(*end)
+    return polyline(surf, (start, end), color, width, style)
+
+
+def polyline(surf, points, color=BLACK, width=1, style=FLAT, join=MITER):
+    """
+    Draws an antialiased line through all the points, and return the rect it covers.
+
+    :param style: the ends of the line, FLAT or ROUNDED
+    :param join: how the segments are joined, MITER, BEVEL or ROUNDED.
+        Too sharp miter joins are drawn as bevel ones.
+    """
+
+    # consecutive duplicates make segments with no direction
+    points = [tuple(p) for i, p in enumerate(points) if i == 0 or tuple(p) != tuple(points[i - 1])]
+
+    if len(points) < 2:
+        if points and style == ROUNDED:
+            return circle(surf, points[0], width / 2, color)
+        return pygame.Rect(points[0] if points else (0, 0), (0, 0))
+
+    if width <= 1:
+        return pygame.draw.aalines(surf, color, False, points)
+
+    hw = width / 2
+
+    # unit normals of each segment
+    normals = []
+    for (x1, y1), (x2, y2) in zip(points, points[1:]):
+        dx = x2 - x1
+        dy = y2 - y1
+        norm = hypot(dx, dy)
+        normals.append((-dy / norm, dx / norm))
+
+    # the left and right border of each segment, where it starts and ends
+    x, y = points[0]
+    nx, ny = normals[0]
+    starts = [((x + nx * hw, y + ny * hw), (x - nx * hw, y - ny * hw))]
+    ends = []
+    joints = []  # the points where we need to fill a join
+
+    for i in range(1, len(points) - 1):
+        x, y = points[i]
+        (nx1, ny1), (nx2, ny2) = normals[i - 1], normals[i]
+        mx, my = nx1 + nx2, ny1 + ny2
+        # cos of the half angle between the segments
+        cos_half = (mx * nx1 + my * ny1) / (hypot(mx, my) or 1)
+
+        if join == MITER and cos_half > 1 / MITER_LIMIT:
+            length = hw / cos_half / hypot(mx, my)
+            left = x + mx * length, y + my * length
+            right = x - mx * length, y - my * length
+            ends.append((left, right))
+            starts.append((left, right))
+        else:
+            ends.append(((x + nx1 * hw, y + ny1 * hw), (x - nx1 * hw, y - ny1 * hw)))
+            starts.append(((x + nx2 * hw, y + ny2 * hw), (x - nx2 * hw, y - ny2 * hw)))
+            joints.append(i)
 
-    line_vector = end - start
-    half_side = line_vector.normnorm() * width / 2
+    x, y = points[-1]
+    nx, ny = normals[-1]
+    ends.append(((x + nx * hw, y + ny * hw), (x - nx * hw, y - ny * hw)))
 
-    point1 = start + half_side
-    point2 = start - half_side
-    point3 = end - half_side
-    point4 = end + half_side
+    # each segment is a quad, they are filled separately because the border can cross itself in sharp turns
+    for (left1, right1), (left2, right2) in zip(starts, ends):
+        gfxdraw.filled_polygon(surf, (left1, left2, right2, right1), color)
 
-    # noinspection PyUnresolvedReferences
-    liste = [
-        (point1.x, point1.y),
-        (point2.x, point2.y),
-        (point3.x, point3.y),
-        (point4.x, point4.y)
-    ]
+    for i in joints:
+        if join == ROUNDED:
+            circle(surf, points[i], hw, color)
+        else:
+            (left1, right1), (left2, right2) = ends[i - 1], starts[i]
+            gfxdraw.filled_polygon(surf, (points[i], left1, left2), color)
+            gfxdraw.filled_polygon(surf, (points[i], right1, right2), color)
 
-    rect = polygon(surf, liste, color)
+    # the antialiased border of the whole line at once
+    border = [p for pair in zip(starts, ends) for p in (pair[0][0], pair[1][0])]
+    border += [p for pair in reversed(list(zip(starts, ends))) for p in (pair[1][1], pair[0][1])]
+    gfxdraw.aapolygon(surf, border, color)
 
     if style == ROUNDED:
-        _ = circle(surf, start, width / 2, color)
-        rect = merge_rects(rect, _)
-        _ = circle(surf, end, width / 2, color)
-        rect = merge_rects(rect, _)
+        circle(surf, points[0], hw, color)
+        circle(surf, points[-1], hw, color)
 
-    return rect
+    xs, ys = zip(*border, *points)
+    margin = hw + 1 if style == ROUNDED or join == ROUNDED else 1
+    # rounded outwards, so the rect contains every pixel drawn
+    left, top = floor(min(xs) - margin), floor(min(ys) - margin)
+    return pygame.Rect(left, top, ceil(max(xs) + margin) - left, ceil(max(ys) + margin) - top)
 
 
 def circle(surf, xy, r, color=BLACK):
@@ -59,67 +147,109 @@ def circle(surf, xy, r, color=BLACK):
 
     x = round(x)
     y = round(y)
-    r = round(r)
+    r = max(round(r), 0)
 
-    gfxdraw.filled_circle(surf, x, y, r, color)
-    gfxdraw.aacircle(surf, x, y, r, color)
+    sprite = sprite_cache.get_or_create(('circle', r, _color_key(color)), lambda: _circle_sprite(r, color))
+    surf.blit(sprite, (x - r, y - r))
 
     r += 1
     return pygame.Rect(x - r, y - r, 2 * r, 2 * r)
 
 
-def ring(surf, xy, r, width, color):
-    """Draws a ring"""
+def _circle_sprite(r, color):
+    color = pygame.Color(*color)
+    opaque = color.r, color.g, color.b, 255
+    sprite = _new_sprite((2 * r + 1, 2 * r + 1), color)
+
+    # the coverage is drawn opaque, a translucent color would be blended with itself on the border.
+    # The antialiased border first: drawing it on top of the disk would make the border pixels transparent
+    gfxdraw.aacircle(sprite, r, r, r, opaque)
+    gfxdraw.filled_circle(sprite, r, r, r, opaque)
+
+    # then the alpha is the coverage times the alpha of the color
+    if color.a != 255:
+        sprite.fill((255, 255, 255, color.a), special_flags=BLEND_RGBA_MULT)
+
+    return sprite
+
+
+def ring(surf, xy, r, width, color, start_angle=None, stop_angle=None):
+    """
+    Draws an antialiased ring, or a part of it.
 
-    r2 = r - width
+    The angles are in radians, counterclockwise from the right, like pygame.draw.arc.
+    If they are not given, the full ring is drawn.
+    """
 
     x0, y0 = xy
-    x = r2
-    y = 0
-    err = 0
-
-    # collect points of the inner circle
-    right = {}
-    while x >= y:
-        right[x] = y
-        right[y] = x
-        right[-x] = y
-        right[-y] = x
-
-        y += 1
-        if err <= 0:
-            err += 2 * y + 1
-        if err > 0:
-            x -= 1
-            err -= 2 * x + 1
-
-    def h_fill_the_circle(surf, color, x, y, right):
-        if -r2 <= y <= r2:
-            pygame.draw.line(surf, color, (x0 + right[y], y0 + y), (x0 + x, y0 + y))
-            pygame.draw.line(surf, color, (x0 - right[y], y0 + y), (x0 - x, y0 + y))
-        else:
-            pygame.draw.line(surf, color, (x0 - x, y0 + y), (x0 + x, y0 + y))
+    r = round(r)
+    width = round(width)
+
+    if start_angle is None or stop_angle is None:
+        arc = None
+    else:
+        arc = start_angle % (2 * pi), (stop_angle - start_angle) % (2 * pi) or 2 * pi
+
+    key = 'ring', r, width, arc, _color_key(color)
+    sprite = sprite_cache.get_or_create(key, lambda: _ring_sprite(r, width, color, arc))
+    return surf.blit(sprite, (round(x0) - r - 1, round(y0) - r - 1))
+
+
+def _ring_sprite(r, width, color, arc=None):
+    """
+    A sprite of a ring of center (r + 1, r + 1), the extra pixel is for the antialiasing.
+
+    Arc is None or (start angle, angle span).
+    """
+    if numpy is None:
+        return _ring_sprite_supersampled(r, width, color, arc)
+
+    color = pygame.Color(*color)
+    sprite = _new_sprite((2 * r + 3, 2 * r + 3), color)
+
+    # the coverage of each pixel, computed from the distance of its center to the center of the ring:
+    # pixels at a distance between r - width and r are fully covered
+    x, y = numpy.ogrid[-r - 1:r + 2, -r - 1:r + 2]
+    dist = numpy.hypot(x, y)
+    coverage = numpy.clip(r + 1 - dist, 0, 1) * numpy.clip(dist - (r - width) + 1, 0, 1)
+
+    if arc is not None:
+        start, span = arc
+        # angle of each pixel from the start of the arc, the y axis goes down on the screen
+        angle = (numpy.arctan2(-y, x) - start) % (2 * pi)
+        # distance in pixels to the closest end of the arc, negative outside
+        inside = numpy.minimum(angle, span - angle)
+        outside = numpy.minimum(angle - span, 2 * pi - angle)
+        edge = numpy.where(angle <= span, inside, -outside) * dist
+        coverage *= numpy.clip(edge + 0.5, 0, 1)
 
-    x = r
-    y = 0
-    err = 0
+    alpha = pygame.surfarray.pixels_alpha(sprite)
+    alpha[:] = (coverage * color.a).round()
+    del alpha  # unlock the surface
 
-    while x >= y:
+    return sprite
+
+
+def _ring_sprite_supersampled(r, width, color, arc=None, scale=4):
+    """Same as _ring_sprite, without numpy: the ring is drawn bigger and then scaled down to smooth the edges."""
+    color = pygame.Color(*color)
+    transparent = color.r, color.g, color.b, 0
+    size = (2 * r + 3) * scale
+    center = size // 2, size // 2
 
-        h_fill_the_circle(surf, color, x, y, right)
-        h_fill_the_circle(surf, color, x, -y, right)
-        h_fill_the_circle(surf, color, y, x, right)
-        h_fill_the_circle(surf, color, y, -x, right)
+    big = _new_sprite((size, size), color)
+    pygame.draw.circle(big, color, center, (r + 0.5) * scale)
+    pygame.draw.circle(big, transparent, center, (r - width - 0.5) * scale)
 
-        y += 1
-        if err < 0:
-            err += 2 * y + 1
-        if err >= 0:
-            x -= 1
-            err -= 2 * x + 1
+    if arc is not None and arc[1] < 2 * pi:
+        # hide the part of the ring that is not in the arc
+        start, span = arc
+        steps = max(2, int((2 * pi - span) * r))
+        outside = [start + span + (2 * pi - span) * i / steps for i in range(steps + 1)]
+        polygon = [center] + [(center[0] + 2 * size * cos(a), center[1] - 2 * size * sin(a)) for a in outside]
+        pygame.draw.polygon(big, transparent, polygon)
 
-    gfxdraw.aacircle(surf, x0, y0, r, color)
-    gfxdraw.aacircle(surf, x0, y0, r2, color)
+    return pygame.transform.smoothscale(big, (2 * r + 3, 2 * r + 3))
 
 
 def roundrect(surface, rect, color, rounding=5, unit=PIXEL):
@@ -133,15 +263,22 @@ def roundrect(surface, rect, color, rounding=5, unit=PIXEL):
     :source: http://pygame.org/project-AAfilledRoundedRect-2349-.html
     """
 
+    rect = pygame.Rect(rect)
+
     if unit == PERCENT:
         rounding = int(min(rect.size) / 2 * rounding / 100)
 
-    rect = pygame.Rect(rect)
+    key = 'roundrect', rect.size, rounding, _color_key(color)
+    sprite = sprite_cache.get_or_create(key, lambda: _roundrect_sprite(rect.size, color, rounding))
+
+    return surface.blit(sprite, rect.topleft)
+
+
+def _roundrect_sprite(size, color, rounding):
+    rect = pygame.Rect((0, 0), size)
     color = pygame.Color(*color)
     alpha = color.a
     color.a = 0
-    pos = rect.topleft
-    rect.topleft = 0, 0
     rectangle = pygame.Surface(rect.size, SRCALPHA)
 
     circle = pygame.Surface([min(rect.size) * 3] * 2, SRCALPHA)
@@ -162,7 +299,7 @@ def roundrect(surface, rect, color, rounding=5, unit=PIXEL):
     rectangle.fill(color, special_flags=BLEND_RGBA_MAX)
     rectangle.fill((255, 255, 255, alpha), special_flags=BLEND_RGBA_MIN)
 
-    return surface.blit(rectangle, pos)
+    return rectangle
 
 
 def polygon(surf, points, color):
@@ -171,12 +308,10 @@ def polygon(surf, points, color):
     gfxdraw.aapolygon(surf, points, color)
     gfxdraw.filled_polygon(surf, points, color)
 
-    x = min([x for (x, y) in points])
-    y = min([y for (x, y) in points])
-    xm = max([x for (x, y) in points])
-    ym = max([y for (x, y) in points])
+    xs, ys = zip(*points)
+    x, y = min(xs), min(ys)
 
-    return pygame.Rect(x, y, xm - x, ym - y)
+    return pygame.Rect(x, y, max(xs) - x, max(ys) - y)
 
 
-__all__ = ['circle', 'line', 'polygon', 'ring']
+__all__ = ['circle', 'line', 'polyline', 'polygon', 'ring', 'roundrect', 'sprite_cache']
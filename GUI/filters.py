@@ -0,0 +1,155 @@
+# coding=utf-8
+
+"""
+Effects on whole images: brightness, tint, desaturation, transparency and blur.
+
+Every filter returns a new surface and keeps the transparency of the image. The blending filters
+use pygame blend fills, the others need numpy for pygame.surfarray.
+"""
+
+from math import ceil, exp
+
+import pygame
+from pygame.constants import SRCALPHA, BLEND_RGB_MULT, BLEND_RGB_ADD, BLEND_RGBA_MULT
+
+try:
+    import numpy
+except ImportError:  # desaturate() and the blurs are not available
+    numpy = None
+
+from GUI.colors import mix
+from GUI.locals import WHITE
+
+
+def _copy(surf, alpha=False):
+    """
+    A copy of the surface in 24 or 32 bits, so its pixels can be blended and used as arrays.
+
+    A colorkey becomes per-pixel transparency, so the filters do not change the transparent pixels.
+    It works without a display mode, unlike Surface.convert().
+    """
+
+    if surf.get_bitsize() in (24, 32) and surf.get_colorkey() is None and (surf.get_flags() & SRCALPHA or not alpha):
+        return surf.copy()
+
+    result = pygame.Surface(surf.get_size(), SRCALPHA, 32)
+    result.fill((0, 0, 0, 0))
+    result.blit(surf, (0, 0))
+    return result
+
+
+def _need_numpy(name):
+    if numpy is None:
+        raise ImportError('GUI.filters.{}() needs numpy'.format(name))
+
+
+def _channel(value):
+    return max(0, min(255, int(round(value))))
+
+
+def brightness(surf, factor):
+    """Return the image with its colors multiplied by factor: 0.8 is 20% darker, 1.2 is 20% brighter."""
+    result = _copy(surf)
+    if factor <= 1:
+        result.fill((_channel(255 * factor),) * 3, special_flags=BLEND_RGB_MULT)
+        return result
+
+    # c * factor = c + c * (factor - 1), the add saturates at 255
+    while factor > 1:
+        extra = result.copy()
+        extra.fill((_channel(255 * min(factor - 1, 1)),) * 3, special_flags=BLEND_RGB_MULT)
+        result.blit(extra, (0, 0), special_flags=BLEND_RGB_ADD)
+        factor /= 2
+    return result
+
+
+def tint(surf, color, amount=1):
+    """Return the image multiplied by a color, mixed with the original by amount (0 to 1)."""
+    result = _copy(surf)
+    result.fill(mix(color, WHITE, amount)[:3], special_flags=BLEND_RGB_MULT)
+    return result
+
+
+def alpha_multiply(surf, factor):
+    """Return the image with its transparency multiplied by factor: 0.5 is half transparent."""
+    result = _copy(surf, alpha=True)
+    result.fill((255, 255, 255, _channel(255 * factor)), special_flags=BLEND_RGBA_MULT)
+    return result
+
+
+def desaturate(surf, amount=1):
+    """Return the image in grey (amount is 1) or with less saturated colors."""
+    _need_numpy('desaturate')
+
+    result = _copy(surf)
+    pixels = pygame.surfarray.pixels3d(result)
+    rgb = pixels.astype(float)
+    grey = rgb @ numpy.array([0.299, 0.587, 0.114])
+    pixels[...] = numpy.rint(rgb + amount * (grey[..., None] - rgb))
+    del pixels  # unlock the surface
+    return result
+
+
+def _convolve(surf, blur):
+    """Return the image with a separable blur applied on its premultiplied colors."""
+    result = _copy(surf)
+    has_alpha = bool(result.get_flags() & SRCALPHA)
+
+    rgb = pygame.surfarray.array3d(result).astype(float)
+    if has_alpha:
+        # blurring the premultiplied colors keeps the color of transparent pixels out
+        alpha = pygame.surfarray.array_alpha(result).astype(float)
+        rgb *= alpha[..., None] / 255
+        rgb = numpy.dstack((rgb, alpha))
+
+    rgb = blur(blur(rgb, 0), 1)
+
+    if has_alpha:
+        alpha = rgb[..., 3]
+        rgb = rgb[..., :3] * (255 / numpy.maximum(alpha, 1e-9))[..., None]
+        pixels_alpha = pygame.surfarray.pixels_alpha(result)
+        pixels_alpha[...] = numpy.rint(alpha)
+        del pixels_alpha
+
+    pixels = pygame.surfarray.pixels3d(result)
+    pixels[...] = numpy.clip(numpy.rint(rgb), 0, 255)
+    del pixels
+    return result
+
+
+def _blur_axis(array, axis, weights):
+    """Convolve an array along an axis with symmetric weights, the borders being repeated."""
+    radius = len(weights) // 2
+    size = array.shape[axis]
+    padded = numpy.take(array, numpy.clip(numpy.arange(-radius, size + radius), 0, size - 1), axis)
+
+    result = numpy.zeros_like(array)
+    for i, weight in enumerate(weights):
+        result += weight * numpy.take(padded, numpy.arange(i, i + size), axis)
+    return result
+
+
+def box_blur(surf, radius):
+    """Return the image where each pixel is the mean of the square of pixels around it, of side 2 * radius + 1."""
+    _need_numpy('box_blur')
+    if radius < 1:
+        return _copy(surf)
+
+    weights = [1 / (2 * radius + 1)] * (2 * radius + 1)
+    return _convolve(surf, lambda array, axis: _blur_axis(array, axis, weights))
+
+
+def gaussian_blur(surf, sigma):
+    """Return the image blurred with a gaussian of standard deviation sigma, in pixels."""
+    _need_numpy('gaussian_blur')
+    if sigma <= 0:
+        return _copy(surf)
+
+    radius = int(ceil(3 * sigma))
+    weights = [exp(-x * x / (2 * sigma * sigma)) for x in range(-radius, radius + 1)]
+    total = sum(weights)
+    weights = [w / total for w in weights]
+    return _convolve(surf, lambda array, axis: _blur_axis(array, axis, weights))
+
+
+__all__ = ['brightness', 'tint', 'alpha_multiply', 'desaturate', 'box_blur', 'gaussian_blur']
@@ -1,33 +1,101 @@
 # coding=utf-8
 
 """This module provides easy to use fonts."""
-from math import floor
+import json
+import os
+import sys
 from pygame import font
 
 from GUI.locals import GUI_PATH
 
 font.init()
 
+# SIZE_TABLE path -> {font file key -> {px: pt}}, the path None is for the conversions not kept on disk
+_size_tables = {}
+
+
+def _file_key(file):
+    """A key of a font file, that changes if the file changes."""
+    try:
+        stat = os.stat(file)
+    except (OSError, TypeError):  # not a path, like a file object
+        return repr(file)
+    return '{}|{}|{}'.format(os.path.abspath(file), stat.st_size, int(stat.st_mtime))
+
+
+def _size_table(path):
+    """The px to pt conversions of a SIZE_TABLE, read from the disk the first time."""
+    try:
+        return _size_tables[path]
+    except KeyError:
+        pass
+
+    table = {}
+    if path is not None:
+        try:
+            with open(path) as f:
+                table = json.load(f)
+        except (OSError, ValueError):  # no table yet, or a broken one
+            pass
+
+    return _size_tables.setdefault(path, table)
+
+
+def _save_size_table(path):
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    partial = '{}.{}.part'.format(path, os.getpid())
+    with open(partial, 'w') as f:
+        json.dump(_size_tables[path], f)
+    os.replace(partial, path)
+
+
+def _measure_pt(file, px):
+    """The biggest size in points of the font file with a height of at most px pixels, by bisection."""
+
+    def height(pt):
+        return font.Font(file, pt).get_height()
+
+    if height(1) > px:
+        return 1
+
+    # the height grows with the size, and a point is never smaller than a pixel
+    lo, hi = 1, max(px, 2)
+    while height(hi) <= px:
+        lo, hi = hi, 2 * hi
+
+    while hi - lo > 1:
+        mid = (lo + hi) // 2
+        if height(mid) <= px:
+            lo = mid
+        else:
+            hi = mid
+    return lo
+
+
+DEFAULT_FILE = GUI_PATH + r'/data/fonts/segoeuil.ttf'
+
 
 class Font(font.Font):
-    """A pygame.font.Font font, with no aditionnal methods but provide a good default behavior."""
-
-    PX_TO_PT = [
-        1, 1, 1, 1, 2, 3, 3, 4, 5, 6, 7, 7, 8, 9, 10, 11, 11, 12, 12, 13, 14, 15, 15, 16, 17, 18, 19, 19, 20, 21, 22,
-        23, 23, 24, 25, 25, 26, 27, 27, 28, 29, 30, 31, 31, 32, 33, 34, 35, 35, 36, 37, 38, 38, 39, 39, 40, 41, 42, 43,
-        43, 44, 45, 46, 47, 47, 48, 49, 50, 50, 51, 51, 52, 53, 54, 55, 55, 56, 57, 58, 59, 59, 60, 61, 62, 63, 63, 63,
-        64, 65, 66, 67, 67, 68, 69, 70, 71, 71, 72, 73, 74, 75, 75, 75, 76, 77, 78, 79, 79, 80, 81, 82, 83, 83, 84, 85,
-        86, 87, 87, 88, 88, 89, 90, 91, 91, 92, 93, 94, 95, 95, 96, 97, 98, 99, 99, 100, 101, 101, 102, 103, 103, 104,
-        105, 106, 107, 107, 108, 109, 110, 111, 111, 112, 113, 113, 114, 115, 115, 116, 117, 118, 119, 119, 120, 121,
-        122, 123, 123, 124, 125, 126, 126, 127, 127, 128, 129, 130, 131, 131, 132, 133, 134, 135, 135, 136, 137, 138,
-        139, 139, 139, 140, 141, 142, 143, 143, 144, 145, 146, 147, 147, 148, 149
-    ]
-    # MMMMMMMMMH WHAT A BEAUTIFULL WAY TO MAKE CONVERSIONS <3 <3 <3 <3 <3
+    """
+    A pygame.font.Font font, with no aditionnal methods but provide a good default behavior.
+
+    Widgets should use Font.get(), that shares one font per file and size instead of loading the file again.
+    """
+
+    # a json file where the px to pt conversions are kept between launches, or None
+    SIZE_TABLE = None
 
     POINT = 42
     PIXEL = 69
 
-    def __init__(self, size=20, file=GUI_PATH + r'/data/fonts/segoeuil.ttf', unit=POINT):
+    # (file, size in pt) -> the shared font
+    _pool = {}
+    # whether the font is shared and so can not be changed
+    shared = False
+    # the properties of pygame 2 that change the style or the size
+    _STYLE_ATTRS = frozenset(('bold', 'italic', 'underline', 'strikethrough', 'point_size'))
+
+    def __init__(self, size=20, file=DEFAULT_FILE, unit=POINT):
         """
         Creates a Font object.
         
@@ -36,35 +104,109 @@ class Font(font.Font):
         """
 
         if unit == self.PIXEL:
-            size = self.px_to_pt(size)
+            size = self.px_to_pt(size, file)
 
         super(Font, self).__init__(file, size)
         self.font_size = size
         self.font_name = file
 
-    def px_to_pt(self, px):
-        """Convert a size in pxel to a size in points."""
-        if px < 200:
-            pt = self.PX_TO_PT[px]
-        else:
-            pt = int(floor((px - 1.21) / 1.332))
+    @classmethod
+    def get(cls, size=20, file=DEFAULT_FILE, unit=POINT):
+        """
+        Return the shared font with this file and size, loading it the first time.
+
+        The shared fonts can not be resized or styled, use resized() to have one of another size.
+        """
+
+        if unit == cls.PIXEL:
+            size = cls.px_to_pt(size, file)
+
+        try:
+            return cls._pool[file, size]
+        except KeyError:
+            pass
+
+        shared = Font(size, file)
+        shared.shared = True
+        return cls._pool.setdefault((file, size), shared)
+
+    def resized(self, pt=None, px=None):
+        """Return the shared font with the same file, in the size in pt or px."""
+        assert (pt, px) != (None, None)
 
+        if pt is not None:
+            return Font.get(pt, self.font_name)
+        return Font.get(px, self.font_name, self.PIXEL)
+
+    def _check_not_shared(self):
+        if self.shared:
+            raise TypeError('A shared font can not be changed, use resized() or a Font of your own.')
+
+    def __setattr__(self, key, value):
+        if key in self._STYLE_ATTRS:
+            self._check_not_shared()
+        super().__setattr__(key, value)
+        if key == 'point_size':
+            # the caches know the size by font_size
+            super().__setattr__('font_size', value)
+
+    def set_bold(self, value):
+        self._check_not_shared()
+        super().set_bold(value)
+
+    def set_italic(self, value):
+        self._check_not_shared()
+        super().set_italic(value)
+
+    def set_underline(self, value):
+        self._check_not_shared()
+        super().set_underline(value)
+
+    def set_strikethrough(self, value):
+        self._check_not_shared()
+        super().set_strikethrough(value)
+
+    def set_point_size(self, value):
+        self._check_not_shared()
+        super().set_point_size(value)
+        self.font_size = value
+
+    @classmethod
+    def px_to_pt(cls, px, file=DEFAULT_FILE):
+        """
+        Convert a size in pixel to a size in points, for a font file.
+
+        It is the biggest size whose height is at most px, found by measuring the font. The result is
+        remembered, and kept in SIZE_TABLE if it is set.
+        """
+
+        key = _file_key(file)
+        sizes = _size_table(cls.SIZE_TABLE).setdefault(key, {})
+        try:
+            return sizes[str(px)]
+        except KeyError:
+            pass
+
+        pt = sizes[str(px)] = _measure_pt(file, px)
+        if cls.SIZE_TABLE is not None:
+            _save_size_table(cls.SIZE_TABLE)
         return pt
 
     def set_size(self, pt=None, px=None):
         """
         Set the size of the font, in px or pt.
 
-        The px method is a bit inacurate, there can be one or two px less, and max 4 for big numbers (like 503)
-        but the size is never over-estimated. It makes almost the good value.
+        With px, the font is the biggest one whose height is at most px.
+        Shared fonts can not be resized, see resized().
         """
 
         assert (pt, px) != (None, None)
+        self._check_not_shared()
 
         if pt is not None:
             self.__init__(pt, self.font_name)
         else:
-            self.__init__(self.px_to_pt(px), self.font_name)
+            self.__init__(self.px_to_pt(px, self.font_name), self.font_name)
 
 
 class BoldFont(Font):
@@ -86,6 +228,20 @@ class BoldFont(Font):
         super(BoldFont, self).__init__(size, GUI_PATH + r'/data/fonts/' + file + '.ttf', unit)
 
 
-DEFAULT_FONT = Font(20)
+def default_font():
+    """The font of the widgets created without one. It is loaded the first time it is needed."""
+    return Font.get(20)
+
+
+def __getattr__(name):
+    # DEFAULT_FONT is loaded only when used
+    if name == 'DEFAULT_FONT':
+        return default_font()
+    raise AttributeError('module {!r} has no attribute {!r}'.format(__name__, name))
+
+
+if sys.version_info < (3, 7):
+    # no module __getattr__ before python 3.7
+    DEFAULT_FONT = default_font()
 
-__all__ = ['Font', 'DEFAULT_FONT']
+__all__ = ['Font', 'DEFAULT_FONT', 'default_font']
@@ -0,0 +1,130 @@
+# coding=utf-8
+
+"""
+A text storage that is cheap to edit where the last edit was.
+
+The characters are kept in a list with a gap of free slots at the position of the last edit, so typing at the
+cursor only moves the gap, and the rest of the text is never copied.
+"""
+
+
+class GapBuffer:
+    """A mutable string."""
+
+    def __init__(self, text='', gap=64):
+        self._chars = list(text) + [''] * gap
+        self._start = len(text)  # the gap is _chars[_start:_end]
+        self._end = len(self._chars)
+
+    def __repr__(self):
+        return 'GapBuffer({!r})'.format(str(self))
+
+    def __str__(self):
+        return ''.join(self._chars[:self._start]) + ''.join(self._chars[self._end:])
+
+    def __len__(self):
+        return len(self._chars) - self._end + self._start
+
+    def __eq__(self, other):
+        return str(self) == str(other)
+
+    def __getitem__(self, item):
+        if isinstance(item, slice):
+            start, stop, step = item.indices(len(self))
+            if step != 1:
+                return str(self)[item]
+            return ''.join(self._slice(start, stop))
+
+        if item < 0:
+            item += len(self)
+        if not 0 <= item < len(self):
+            raise IndexError('GapBuffer index out of range')
+        return self._chars[item if item < self._start else item + self._end - self._start]
+
+    def _slice(self, start, stop):
+        """The list of characters from start to stop, without the gap."""
+        if stop <= start:
+            return []
+
+        gap = self._end - self._start
+        if stop <= self._start:
+            return self._chars[start:stop]
+        if start >= self._start:
+            return self._chars[start + gap:stop + gap]
+        return self._chars[start:self._start] + self._chars[self._end:stop + gap]
+
+    def _move_gap(self, pos):
+        """Put the gap at the position, moving the characters between."""
+        chars = self._chars
+        if pos < self._start:
+            moved = self._start - pos
+            chars[self._end - moved:self._end] = chars[pos:self._start]
+            self._start -= moved
+            self._end -= moved
+        elif pos > self._start:
+            moved = pos - self._start
+            chars[self._start:self._start + moved] = chars[self._end:self._end + moved]
+            self._start += moved
+            self._end += moved
+
+    def insert(self, pos, text):
+        """Insert the text before the character at pos."""
+        self._move_gap(pos)
+
+        if len(text) > self._end - self._start:
+            # the gap grows with the text, so long texts are not copied too often
+            grow = len(text) + len(self._chars)
+            self._chars[self._start:self._start] = [''] * grow
+            self._end += grow
+
+        self._chars[self._start:self._start + len(text)] = text
+        self._start += len(text)
+
+    def delete(self, start, stop):
+        """Delete the characters from start to stop."""
+        if stop <= start:
+            return
+
+        self._move_gap(start)
+        self._end += stop - start
+
+    def replace(self, start, stop, text):
+        """Replace the characters from start to stop by the text."""
+        self.delete(start, stop)
+        self.insert(start, text)
+
+    def find(self, char, start=0):
+        """Return the index of the first occurrence of the character after start, or -1."""
+        start = max(start, 0)
+        try:
+            if start < self._start:
+                try:
+                    return self._chars.index(char, start, self._start)
+                except ValueError:
+                    start = self._start
+            gap = self._end - self._start
+            return self._chars.index(char, start + gap) - gap
+        except ValueError:
+            return -1
+
+    def rfind(self, char, start=0, stop=None):
+        """Return the index of the last occurrence of the character between start and stop, or -1."""
+        start = max(start, 0)
+        stop = len(self) if stop is None else min(stop, len(self))
+        gap = self._end - self._start
+
+        # the part after the gap first
+        if stop > self._start:
+            first = max(start, self._start)
+            part = self._chars[first + gap:stop + gap]
+            if char in part:
+                return first + len(part) - 1 - part[::-1].index(char)
+            stop = self._start
+
+        part = self._chars[start:stop]
+        if char in part:
+            return start + len(part) - 1 - part[::-1].index(char)
+        return -1
+
+
+__all__ = ['GapBuffer']
@@ -8,6 +8,7 @@ from GUI.base import BaseWidget
 from GUI.draw import circle, line, roundrect
 from GUI.locals import TURQUOISE, PINK, TOPLEFT, PURPLE, PIXEL
 from GUI.math import V2
+from GUI.reactive import computed, modifier
 
 
 class Point(BaseWidget):
@@ -38,12 +39,16 @@ class Point(BaseWidget):
 
 
 class Line(BaseWidget):
+
+    pos1 = modifier()
+    pos2 = modifier()
+
     def __init__(self, pos1, pos2, color=PURPLE, line_width=1):
         self.line_width = line_width
         self.color = color
 
-        self._pos1 = pos1
-        self._pos2 = pos2
+        self.pos1 = pos1
+        self.pos2 = pos2
 
         def _pos():
             return min(self.pos1[0], self.pos2[0]), min(self.pos1[1], self.pos2[1])
@@ -51,23 +56,7 @@ class Line(BaseWidget):
         def _size():
             return max(self.pos1[0], self.pos2[0]) - _pos()[0], max(self.pos1[1], self.pos2[1]) - _pos()[1]
 
-        super().__init__(_pos, _size, TOPLEFT)
-
-    @property
-    def pos1(self):
-        return self._pos1 if not callable(self._pos1) else self._pos1()
-
-    @pos1.setter
-    def pos1(self, value):
-        self._pos1 = value
-
-    @property
-    def pos2(self):
-        return self._pos2 if not callable(self._pos2) else self._pos2()
-
-    @pos2.setter
-    def pos2(self, value):
-        self._pos2 = value
+        super().__init__(computed(_pos), computed(_size), TOPLEFT)
 
     def render(self, surf):
         line(surf, self.pos1, self.pos2, self.color, self.line_width)
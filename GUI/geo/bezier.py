@@ -2,54 +2,415 @@
 
 """This module provide a Bezier curve."""
 
+from functools import lru_cache
+from itertools import count
+
 import pygame
 from pygame import gfxdraw
+from pygame.constants import SRCALPHA
+
+try:
+    import numpy
+except ImportError:  # the curve is sampled in pure python, which is a lot slower
+    numpy = None
 
-from GUI.locals import GREEN
+from GUI.draw import line, polyline
+from GUI.locals import GREEN, ROUNDED, WHITE
 from GUI.base import BaseWidget
-from GUI.math import V2, comb
+from GUI.math import V2, comb, segment_distance, simplified_indices
+
+# the flattening stops splitting the curve below this step of t, even if it is not flat enough
+MIN_STEP = 2 ** -16
+
+# versions are unique among all the lists of control points, so a new list never matches an old cache
+_versions = count(1)
+
+
+@lru_cache(maxsize=32)
+def bernstein_matrix(degree, reso):
+    """
+    The Bernstein basis of a given degree, sampled at t = 0, 1/reso, ..., (reso-1)/reso.
+
+    Row i holds the weights of the control points at the i-th sample, so the samples of a curve are
+    this matrix times the array of its control points. The matrices are cached and must not be modified.
+    """
+
+    coefs = [comb(degree, k) for k in range(degree + 1)]
+
+    if numpy is None:
+        rows = []
+        for i in range(reso):
+            t = i / reso
+            rows.append(tuple(c * t ** k * (1 - t) ** (degree - k) for k, c in enumerate(coefs)))
+        return tuple(rows)
+
+    t = numpy.arange(reso, dtype=float)[:, None] / reso
+    k = numpy.arange(degree + 1)
+    matrix = numpy.array(coefs, dtype=float) * t ** k * (1 - t) ** (degree - k)
+    matrix.flags.writeable = False
+    return matrix
+
+
+@lru_cache(maxsize=32)
+def split_matrices(degree):
+    """
+    The matrices that give the control points of the two halves of a curve of a given degree, split at t = 1/2.
+
+    It is de Casteljau's algorithm as two matrix products. The matrices are cached and must not be modified.
+    """
+
+    left = numpy.zeros((degree + 1, degree + 1))
+    for i in range(degree + 1):
+        for j in range(i + 1):
+            left[i, j] = comb(i, j) / 2 ** i
+
+    # the right half is the left half of the reversed curve
+    right = left[::-1, ::-1].copy()
+
+    left.flags.writeable = right.flags.writeable = False
+    return left, right
+
+
+def _split_array(points):
+    left, right = split_matrices(len(points) - 1)
+    return left @ points, right @ points
+
+
+def _is_flat_array(points, tolerance):
+    start, chord = points[0], points[-1] - points[0]
+    inner = points[1:-1] - start
+
+    length = chord @ chord
+    if length:
+        t = numpy.clip(inner @ chord / length, 0, 1)
+        inner = inner - t[:, None] * chord
+
+    return (inner * inner).sum(axis=1).max(initial=0) <= tolerance * tolerance
+
+
+def _split(points):
+    """Split the control points of a curve at t = 1/2 (de Casteljau)."""
+    left, right = [points[0]], [points[-1]]
+    while len(points) > 1:
+        points = [((x1 + x2) / 2, (y1 + y2) / 2) for (x1, y1), (x2, y2) in zip(points, points[1:])]
+        left.append(points[0])
+        right.append(points[-1])
+
+    right.reverse()
+    return left, right
+
+
+def _is_flat(points, tolerance):
+    """A curve is in the convex hull of its control points, so it is flat if they all are close to the chord."""
+    start, end = points[0], points[-1]
+    return all(segment_distance(p, start, end) <= tolerance for p in points[1:-1])
+
+
+class ControlPoints(list):
+    """
+    The control points of a curve, as V2.
+
+    The version changes each time the list is modified, so the curve knows when it must be computed again.
+    The V2 themselves never change: to move a point, replace it.
+    """
+
+    def __init__(self, points=()):
+        super().__init__(_to_v2(p) for p in points)
+        self.version = next(_versions)
+
+    def _changed(self):
+        self.version = next(_versions)
+
+    def __setitem__(self, index, value):
+        if isinstance(index, slice):
+            value = [_to_v2(p) for p in value]
+        else:
+            value = _to_v2(value)
+        super().__setitem__(index, value)
+        self._changed()
+
+    def __delitem__(self, index):
+        super().__delitem__(index)
+        self._changed()
+
+    def __iadd__(self, other):
+        self.extend(other)
+        return self
+
+    def __imul__(self, n):
+        super().__imul__(n)
+        self._changed()
+        return self
+
+    def append(self, point):
+        super().append(_to_v2(point))
+        self._changed()
+
+    def extend(self, points):
+        super().extend(_to_v2(p) for p in points)
+        self._changed()
+
+    def insert(self, index, point):
+        super().insert(index, _to_v2(point))
+        self._changed()
+
+    def pop(self, index=-1):
+        point = super().pop(index)
+        self._changed()
+        return point
+
+    def remove(self, point):
+        super().remove(point)
+        self._changed()
+
+    def clear(self):
+        super().clear()
+        self._changed()
+
+    def reverse(self):
+        super().reverse()
+        self._changed()
+
+    def sort(self, *args, **kwargs):
+        super().sort(*args, **kwargs)
+        self._changed()
+
+
+def _to_v2(point):
+    return point if isinstance(point, V2) else V2(*point)
 
 
 class Bezier(BaseWidget):
-    def __init__(self, pos, size, points, color=GREEN, width=1, reso=2000):
+    def __init__(self, pos, size, points, color=GREEN, width=1, reso=2000, tolerance=0.5):
+        """
+        A Bezier curve defined by its control points.
+
+        :param color: a color or a function that takes the parameter t in [0, 1] and returns a color
+        :param reso: the number of samples drawn, or None to draw the flattened polyline, that adapts to the curve
+        :param tolerance: the maximum distance in pixels between the curve and its flattened polyline
+
+        The samples, the flattened polyline and the stroke are cached until the points or the style change.
+        When only a few points move, the samples are updated with the contribution of those points only.
+        """
+
         super().__init__(pos, size)
 
-        self.points = [V2(*p) for p in points]
+        self._cache = {}  # name -> (key, value)
+        self._control = None  # the control points of the cached samples
+        self.points = points
         self.color = color
         self.line_width = width
         self.reso = reso
+        self.tolerance = tolerance
 
-    def render(self, surf: pygame.Surface):
-        color = self.color
-        n = len(self.points) - 1
-
-        i = 0
-        last_pos = None
-        for t in range(self.reso):
-            t /= self.reso
-            tt = 1 - t
-
-            end = V2(0, 0)
-            for k, p in enumerate(self.points):
-                end += comb(n, k) * p * t ** k * tt ** (n - k)
-
-            if end.ti == last_pos:
-                i += 1
-                continue
+    @property
+    def points(self):
+        """The control points, see ControlPoints."""
+        return self._points
+
+    @points.setter
+    def points(self, points):
+        self._points = ControlPoints(points)
+
+    def needs_redraw(self):
+        return super().needs_redraw() or self._cache.get('stroke', (None,))[0] != self._stroke_key()
+
+    def _cached(self, name, key, compute):
+        """Return the value cached under this name if it was computed with the same key, else compute it."""
+        try:
+            last_key, value = self._cache[name]
+            if last_key == key:
+                return value
+        except KeyError:
+            pass
+
+        value = compute()
+        self._cache[name] = key, value
+        return value
+
+    def samples(self):
+        """
+        Return the reso points of the curve, as a (reso, 2) array, or a list of tuples without numpy.
+
+        The result is cached and must not be modified.
+        """
+        return self._cached('samples', (self.points.version, self.reso), self._compute_samples)
+
+    def _compute_samples(self):
+        matrix = bernstein_matrix(len(self.points) - 1, self.reso)
+
+        if numpy is None:
+            points = self.points
+            return [(sum(w * p.x for w, p in zip(row, points)), sum(w * p.y for w, p in zip(row, points)))
+                    for row in matrix]
+
+        control = numpy.array([(p.x, p.y) for p in self.points], dtype=float)
+        last = self._cache.get('samples')
+
+        # each point adds its own term to the samples, so we only add the difference of the moved ones
+        if last is not None and last[0][1] == self.reso and self._control.shape == control.shape:
+            moved = numpy.flatnonzero((control != self._control).any(axis=1))
+            if len(moved) <= len(control) // 2:
+                samples = last[1] + matrix[:, moved] @ (control - self._control)[moved]
+            else:
+                samples = matrix @ control
+        else:
+            samples = matrix @ control
+
+        self._control = control
+        samples.flags.writeable = False
+        return samples
+
+    def pixels(self):
+        """
+        Return the pixels the curve goes through and the parameter t of each one.
+
+        Consecutive samples that fall on the same pixel are only kept once.
+        """
+        return self._cached('pixels', (self.points.version, self.reso), self._compute_pixels)
+
+    def _compute_pixels(self):
+        samples = self.samples()
+
+        if numpy is None:
+            ts, pixels = [], []
+            last = None
+            for i, (x, y) in enumerate(samples):
+                pixel = round(x), round(y)
+                if pixel != last:
+                    ts.append(i / self.reso)
+                    pixels.append(pixel)
+                    last = pixel
+            return ts, pixels
+
+        pixels = numpy.rint(samples).astype(int)
+        keep = numpy.ones(len(pixels), dtype=bool)
+        keep[1:] = (pixels[1:] != pixels[:-1]).any(axis=1)
+
+        ts = numpy.flatnonzero(keep) / self.reso
+        return ts.tolist(), [tuple(p) for p in pixels[keep].tolist()]
+
+    def flatten(self, tolerance=None):
+        """
+        Return a polyline that is closer than tolerance pixels to the curve, and the parameter t of each of its points.
+
+        The curve is split by de Casteljau until every piece is flat, then the polyline is simplified,
+        so a short or straight curve has only a few segments and a long one stays smooth.
+        """
+
+        if tolerance is None:
+            tolerance = self.tolerance
+
+        return self._cached('flat', (self.points.version, tolerance), lambda: self._compute_flat(tolerance))
+
+    def _compute_flat(self, tolerance):
+        control = [(p.x, p.y) for p in self.points]
+        ts, points = [0], [control[0]]
+
+        if numpy is None:
+            split, is_flat = _split, _is_flat
+        else:
+            split, is_flat = _split_array, _is_flat_array
+            control = numpy.array(control, dtype=float)
+
+        # the flattening and the simplification may both move the line by half the tolerance
+        stack = [(0, 1, control)]
+        while stack:
+            t0, t1, control = stack.pop()
+
+            if t1 - t0 <= MIN_STEP or is_flat(control, tolerance / 2):
+                ts.append(t1)
+                points.append(tuple(control[-1]))
             else:
-                last_pos = end.ti
+                left, right = split(control)
+                middle = (t0 + t1) / 2
+                stack.append((middle, t1, right))
+                stack.append((t0, middle, left))
 
-            if callable(self.color):
-                color = self.color(t)
+        if numpy is not None:
+            points = [(float(x), float(y)) for x, y in points]
+
+        kept = simplified_indices(points, tolerance / 2)
+        return [ts[i] for i in kept], [points[i] for i in kept]
+
+    def polyline(self, tolerance=None):
+        """Return the points of the flattened curve, see flatten()."""
+        return self.flatten(tolerance)[1]
+
+    def dist_to(self, pos):
+        """Return the distance between a point and the curve, up to the tolerance."""
+        points = self.polyline()
+        if len(points) == 1:
+            return segment_distance(pos, points[0], points[0])
+        return min(segment_distance(pos, a, b) for a, b in zip(points, points[1:]))
+
+    def _stroke_key(self):
+        # a color function may return something else each time, and we need numpy to build the sprite
+        if callable(self.color) or numpy is None:
+            return None
+        return self.points.version, self.reso, self.tolerance, tuple(self.color), self.line_width
+
+    def render(self, surf: pygame.Surface):
+        key = self._stroke_key()
+        if key is None:
+            return self._stroke(surf, (0, 0), self.color)
+
+        sprite, topleft = self._cached('stroke', key, self._compute_stroke)
+        return surf.blit(sprite, topleft)
+
+    def _compute_stroke(self):
+        """Draw the curve on a transparent surface that covers it, and return the surface and its position."""
+        # the curve is in the convex hull of its points
+        margin = self.line_width // 2 + 2
+        left = int(min(p.x for p in self.points)) - margin
+        top = int(min(p.y for p in self.points)) - margin
+        width = int(max(p.x for p in self.points)) + margin + 1 - left
+        height = int(max(p.y for p in self.points)) + margin + 1 - top
+
+        # the antialiasing of gfxdraw does not blend on transparent surfaces, so the curve is drawn
+        # in white on black and the result is used as the alpha of the sprite
+        mask = pygame.Surface((width, height))
+        self._stroke(mask, (left, top), WHITE)
+
+        sprite = pygame.Surface((width, height), SRCALPHA)
+        sprite.fill(self.color)
+        alpha = pygame.surfarray.pixels_alpha(sprite)
+        alpha[...] = pygame.surfarray.pixels_red(mask)
+        del alpha  # unlock the sprite
+
+        return sprite, (left, top)
+
+    def _stroke(self, surf, offset, color):
+        """Draw the curve on the surface, as if the surface was at the offset."""
+        dx, dy = offset
+
+        if self.reso is None:
+            return self._stroke_flat(surf, dx, dy, color)
+
+        ts, pixels = self.pixels()
+
+        radius = round(self.line_width / 2)
+        for t, (x, y) in zip(ts, pixels):
+            c = color(t) if callable(color) else color
 
             if self.line_width < 2:
-                surf.set_at(end.ti, color)
+                surf.set_at((x - dx, y - dy), c)
             else:
-                x, y = end.ti
-                gfxdraw.aacircle(surf, x, y, round(self.line_width / 2), color)
-                gfxdraw.filled_circle(surf, x, y, round(self.line_width / 2), color)
+                gfxdraw.aacircle(surf, x - dx, y - dy, radius, c)
+                gfxdraw.filled_circle(surf, x - dx, y - dy, radius, c)
+
+    def _stroke_flat(self, surf, dx, dy, color):
+        ts, points = self.flatten()
+        points = [(x - dx, y - dy) for x, y in points]
+
+        if not callable(color):
+            return polyline(surf, points, color, self.line_width, ROUNDED, ROUNDED)
 
-        print(i, self.reso, sep='/')
+        rect = None
+        for t1, t2, start, end in zip(ts, ts[1:], points, points[1:]):
+            r = line(surf, start, end, color((t1 + t2) / 2), self.line_width, ROUNDED)
+            rect = r if rect is None else rect.union(r)
+        return rect
 
 
 def example():
@@ -57,7 +418,7 @@ def example():
     gui()
 
 
-__all__ = ['Bezier']
+__all__ = ['Bezier', 'ControlPoints', 'bernstein_matrix', 'split_matrices']
 
 
 if __name__ == '__main__':
@@ -35,7 +35,7 @@ def gui():
         (200, 100),
         (650, 420)
     ]
-    bezier = Bezier((0, 0), SCREEN_SIZE, points, ORANGE, 8)
+    bezier = Bezier((0, 0), SCREEN_SIZE, points, ORANGE, 8, reso=None)
     points = [Point(p, 24, choice(COLORS)) for p in points]
 
     clock = pygame.time.Clock()
@@ -7,6 +7,7 @@ from GUI.buttons import Button, RoundButton
 from GUI.colors import name2rgb, mix
 from GUI.font import Font, BoldFont
 from GUI.geo.basics import Rectangle, Line
+from GUI.reactive import computed
 from GUI.locals import TOPLEFT, BLUE, BOTTOMRIGHT, GOLD, WHITESMOKE, CONCRETE, TOPRIGHT, WHITE, MIDNIGHT_BLUE
 from GUI.text import SimpleText, InLineTextBox
 from GUI.vracabulous import Window, Separator as Sep
@@ -33,8 +34,8 @@ class Lamacorp(Window):
         button_size = lambda:(self.SCREEN_SIZE[0] - 40) / nb_button
 
         self.tab = None
-        self.header = self.add(Rectangle((0, 0), lambda: (self.SCREEN_SIZE[0], header_size), h_color))
-        self.line = self.add(Line((0, header_size), lambda: (self.SCREEN_SIZE[0], header_size), GOLD))
+        self.header = self.add(Rectangle((0, 0), computed(lambda: (self.SCREEN_SIZE[0], header_size)), h_color))
+        self.line = self.add(Line((0, header_size), computed(lambda: (self.SCREEN_SIZE[0], header_size)), GOLD))
         self.title = self.add(
             SimpleText(self.NAME, (16, 8), GOLD, h_color, BoldFont(header_size - 16, Font.PIXEL, BoldFont.LIGHT),
                        TOPLEFT)
@@ -64,7 +65,7 @@ class Lamacorp(Window):
 
             text = texts[row][i % len(texts[row])]
 
-            return _action, _pos, _size, text
+            return _action, computed(_pos), computed(_size), text
 
         start = colour.Color("green"), colour.Color("#00caca")
         end = colour.Color('gold'), colour.Color('navy')
@@ -79,17 +80,18 @@ class Lamacorp(Window):
                 self.add(Button(*get_funcs(color, i, row), name2rgb(color), TOPLEFT, 4 * i + 32 * row))
 
         self.die = self.add(
-            RoundButton(pygame.display.iconify, lambda: self.SCREEN_SIZE + Sep(-10, -10), 40, 'Die', h_color,
-                        BOTTOMRIGHT), lambda: self.tab
+            RoundButton(pygame.display.iconify, computed(lambda: self.SCREEN_SIZE + Sep(-10, -10)), 40, 'Die',
+                        h_color, BOTTOMRIGHT), lambda: self.tab
         )
 
         self.quit = self.add(
-            RoundButton(quit, lambda: (self.SCREEN_SIZE[0] - 8, 8), header_size // 2 - 8, 'X', h_color, TOPRIGHT,
-                        Button.NO_MOVE | Button.NO_SHADOW)
+            RoundButton(quit, computed(lambda: (self.SCREEN_SIZE[0] - 8, 8)), header_size // 2 - 8, 'X', h_color,
+                        TOPRIGHT, Button.NO_MOVE | Button.NO_SHADOW)
         )
 
         self.choose_hint = self.add(
-            SimpleText('Choose your color !', lambda:(self.SCREEN_SIZE[0] // 2, (self.SCREEN_SIZE[1] + header_size) // 2),
+            SimpleText('Choose your color !',
+                       computed(lambda: (self.SCREEN_SIZE[0] // 2, (self.SCREEN_SIZE[1] + header_size) // 2)),
                        CONCRETE, self.BACKGROUND_COLOR, Font(50)),
             # lambda: False
         )
@@ -98,7 +100,7 @@ class Lamacorp(Window):
             Rectangle((120, 40), (300, 300), color=(0, 0, 255, 120), style=Rectangle.ROUNDED)
         )
 
-        self.tect_box = self.add(InLineTextBox(lambda:(self.SCREEN_SIZE[0]//2, self.SCREEN_SIZE[1] - 50),
+        self.tect_box = self.add(InLineTextBox(computed(lambda: (self.SCREEN_SIZE[0]//2, self.SCREEN_SIZE[1] - 50)),
                                                (self.SCREEN_SIZE[0]//2), MIDNIGHT_BLUE))
         self.add(Rectangle(self.tect_box.topleft, self.tect_box.size, GOLD, Rectangle.BORDER))
 
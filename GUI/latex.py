@@ -0,0 +1,202 @@
+# coding=utf-8
+
+"""
+Compile LaTeX equations to images, in the background.
+
+The images are made by the latex and dvipng programs in a pool of threads, the equations requested
+between two flush() being compiled as the pages of one document. They are stored as png
+in a cache directory, named after a hash of the preamble and the equation: an equation is compiled
+only once, even across launches. Set the GUI_LATEX_CACHE environment variable or CACHE_DIR to
+change the cache directory.
+"""
+
+import os
+import shutil
+import subprocess
+import tempfile
+from concurrent.futures import Future, ThreadPoolExecutor
+from hashlib import sha256
+from threading import Lock
+
+import pygame
+
+from GUI.cache import LRUCache
+
+CACHE_DIR = os.environ.get('GUI_LATEX_CACHE') or os.path.join(
+    os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache'), 'GUI', 'latex')
+
+# the number of equations compiled at the same time
+WORKERS = 2
+# the maximum number of seconds for one program
+TIMEOUT = 30
+
+PREAMBLE = (r'\documentclass{article}\pagestyle{empty}'
+            r'\usepackage{color}\usepackage{amsmath}\usepackage{amsfonts}'
+            r'\begin{document}')
+END = r'\end{document}'
+
+# path -> the surface loaded from the png
+image_cache = LRUCache(8 * 2 ** 20)
+
+_executor = None
+_jobs = {}  # path -> the future of a png waiting or being compiled
+_queue = []  # the (page, path) waiting for flush()
+_lock = Lock()
+
+
+class LatexError(Exception):
+    """Raised when latex or dvipng fail, with their output."""
+
+
+def equation_page(source, color, size):
+    """Return the LaTeX for a source in a color (RGB) and font size (pt)."""
+    r, g, b = (c / 255 for c in color[:3])
+    return r'\fontsize{%i pt}{%i pt}\selectfont{\color[rgb]{%.4f,%.4f,%.4f}%s}' % (size, size * 1.2, r, g, b, source)
+
+
+def cache_path(page):
+    """The path of the png of a page in the cache."""
+    digest = sha256((PREAMBLE + page + END).encode('utf-8')).hexdigest()
+    return os.path.join(CACHE_DIR, digest + '.png')
+
+
+def _run(args, cwd):
+    """Run a program in a directory, and raise a LatexError if it fails."""
+    try:
+        done = subprocess.run(args, cwd=cwd, stdin=subprocess.DEVNULL, stdout=subprocess.PIPE,
+                              stderr=subprocess.STDOUT, timeout=TIMEOUT)
+    except (OSError, subprocess.SubprocessError) as e:
+        raise LatexError('{} could not run: {}'.format(args[0], e)) from e
+
+    if done.returncode:
+        output = done.stdout.decode('utf-8', 'replace')
+        raise LatexError('{} failed:\n{}'.format(args[0], output[-2000:]))
+
+
+def compile_pages(pages, paths):
+    """
+    Compile pages to png files at paths, with one latex and one dvipng run.
+
+    If one page is wrong, the whole document fails.
+    """
+
+    with tempfile.TemporaryDirectory() as tmp:
+        with open(os.path.join(tmp, 'eq.tex'), 'w', encoding='utf-8') as f:
+            # the empty box makes sure latex does not drop an empty page
+            f.write(PREAMBLE + '\n\\newpage\n'.join(r'\mbox{}' + page for page in pages) + END)
+
+        _run(['latex', '-halt-on-error', '-interaction=batchmode', 'eq.tex'], tmp)
+        _run(['dvipng', '-T', 'tight', '-z', '9', '--truecolor', '-bg', 'Transparent', '-o', 'eq%d.png', 'eq.dvi'], tmp)
+
+        pngs = [os.path.join(tmp, 'eq{}.png'.format(i + 1)) for i in range(len(pages))]
+        if not all(os.path.exists(png) for png in pngs):
+            raise LatexError('dvipng did not make an image for each of the {} equations'.format(len(pages)))
+
+        try:
+            for png, path in zip(pngs, paths):
+                _store(png, path)
+        except OSError as e:
+            raise LatexError('the images could not be stored in the cache: {}'.format(e)) from e
+
+
+def compile_page(page, path):
+    """Compile a page to a png at path, with latex and dvipng."""
+    compile_pages([page], [path])
+
+
+def _store(png, path):
+    """Move a png in the cache. Readers never see a partial file."""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    partial = '{}.{}.part'.format(path, os.getpid())
+    shutil.copyfile(png, partial)
+    os.replace(partial, path)
+
+
+def load(path):
+    """Return the surface of a png of the cache."""
+    return image_cache.get_or_create(path, lambda: pygame.image.load(path))
+
+
+def _compile(batch):
+    """Compile a list of (page, path) and give the surfaces or the error to their futures."""
+    try:
+        compile_pages([page for page, _ in batch], [path for _, path in batch])
+    except LatexError as e:
+        if len(batch) > 1:
+            # one wrong equation fails the document, so we find it by compiling them alone
+            for item in batch:
+                _compile([item])
+            return
+        error = e
+    except Exception as e:  # not a wrong equation, but the futures must not wait forever
+        error = e
+    else:
+        error = None
+
+    for _, path in batch:
+        with _lock:
+            job = _jobs.pop(path)
+
+        if error is not None:
+            job.set_exception(error)
+            continue
+
+        try:
+            job.set_result(load(path))
+        except pygame.error as e:
+            job.set_exception(LatexError('{} could not be loaded: {}'.format(path, e)))
+        except Exception as e:
+            job.set_exception(e)
+
+
+def request(page):
+    """
+    Return a Future of the surface of a page.
+
+    It is done at once when the png is in the cache, else the page waits for the next flush()
+    to be compiled by a worker. Requests of a page already waiting or compiling share its future.
+    """
+
+    path = cache_path(page)
+    with _lock:
+        job = _jobs.get(path)
+        if job is not None:
+            return job
+
+        if os.path.exists(path):
+            job = Future()
+            try:
+                job.set_result(load(path))
+            except pygame.error:  # a damaged file, we make it again
+                os.remove(path)
+            else:
+                return job
+
+        job = _jobs[path] = Future()
+        _queue.append((page, path))
+        return job
+
+
+def flush():
+    """
+    Compile all the pages requested since the last flush, as one document.
+
+    LaText calls it when it is drawn, so the equations of a screen are compiled together.
+    """
+
+    global _executor
+
+    with _lock:
+        batch = _queue[:]
+        del _queue[:]
+
+        if not batch:
+            return
+
+        if _executor is None:
+            _executor = ThreadPoolExecutor(WORKERS)
+        _executor.submit(_compile, batch)
+
+
+__all__ = ['LatexError', 'equation_page', 'cache_path', 'compile_page', 'compile_pages', 'request', 'flush', 'load',
+           'image_cache', 'CACHE_DIR']
@@ -55,9 +55,11 @@ PERCENT = 'percent'
 
 ROUNDED = 'rounded'
 FLAT = 'flat'
+MITER = 'miter'
+BEVEL = 'bevel'
 
 
 __all__ = ['BLACK', 'WHITE', 'BLUE', 'NICE_BLUE', 'TRUE_BLUE', 'GUI_PATH', 'PURPLE', 'GREEN', 'RED', 'DK_GREEN',
            'ORANGE', 'GREY', 'LIGHT_GREY', 'CENTER', 'TOPLEFT', 'BOTTOMLEFT', 'TOPRIGHT', 'MIDTOP', 'MIDRIGHT',
            'MIDLEFT', 'MIDBOTTOM', 'BOTTOMRIGHT', 'PINK', 'COLORS', 'YELLOW', 'TURQUOISE', 'ROUNDED', 'FLAT',
-           'CONCRETE', 'PUMPKIN', 'FLASH_GREEN', 'MIDNIGHT_BLUE', 'NAVY', 'GOLD', 'WHITESMOKE']
+           'CONCRETE', 'PUMPKIN', 'FLASH_GREEN', 'MIDNIGHT_BLUE', 'NAVY', 'GOLD', 'WHITESMOKE', 'MITER', 'BEVEL']
@@ -0,0 +1,164 @@
+# coding=utf-8
+
+"""
+A widget to show a stream of lines, like a log or a console.
+
+The lines are kept in a ring buffer and rendered once: when lines are added, the image is
+scrolled up and only the new rows are drawn.
+"""
+
+from collections import deque
+
+import pygame
+from pygame.constants import MOUSEBUTTONDOWN, SRCALPHA
+
+from GUI.base import BaseWidget
+from GUI.font import default_font
+from GUI.locals import CENTER, WHITE
+from GUI.text import _font_key
+
+
+class LogView(BaseWidget):
+    """The last lines of a log, the newest at the bottom."""
+
+    # the number of lines scrolled by the mouse wheel
+    WHEEL_LINES = 3
+
+    def __init__(self, pos, size, max_lines=10000, color=WHITE, bg_color=None, font=None, anchor=CENTER):
+        """
+        Creates an empty LogView.
+
+        :param pos: the position of the widget
+        :param size: the size of the widget
+        :param max_lines: the number of lines kept, the oldest are dropped
+        :param color: the default color of the lines
+        :param bg_color: the background color, or None for a transparent background
+        :param font: a pygame.Font object, DEFAULT_FONT if None
+        :param anchor: the anchor of the widget.
+            See http://www.pygame.org/docs/ref/rect.html#pygame.Rect for a list of possible anchors.
+        """
+
+        super().__init__(pos, size, anchor)
+
+        self.font = default_font() if font is None else font
+        self.color = color
+        self.bg_color = bg_color
+
+        self.max_lines = max_lines
+        self.lines = deque(maxlen=max_lines)  # (text, color)
+        # the lines appended by any thread, moved to self.lines by the frame loop.
+        # It is bounded too: when the frame loop is late, the older lines would be dropped anyway
+        self._pending = deque(maxlen=max_lines)
+        self._offset = 0  # the number of lines hidden below the view
+
+        self._surface = None
+        self._drawn = None  # what the surface shows, see _key()
+
+    def __len__(self):
+        return len(self.lines)
+
+    def append(self, text, color=None):
+        """
+        Add a line at the end of the log. Lines breaks make many lines.
+
+        It can be called from any thread: it never waits for the frame loop.
+        """
+
+        for line in str(text).split('\n'):
+            # deque.append is atomic, so there is no lock
+            self._pending.append((line, color))
+
+    def clear(self):
+        """Remove all the lines."""
+        self._pending.clear()
+        self.lines.clear()
+        self._offset = 0
+        self._set('_drawn', None)
+
+    @property
+    def rows(self):
+        """The number of lines that can be seen, the top one may be cut."""
+        height = self.font.get_height()
+        return (self.height + height - 1) // height
+
+    def scroll(self, lines):
+        """Show older (positive) or newer lines."""
+        offset = max(0, min(self._offset + lines, len(self.lines) - self.rows))
+        self._offset = offset
+
+    def update(self, event_or_list):
+        """Scroll with the mouse wheel."""
+        event_or_list = super().update(event_or_list)
+
+        for e in event_or_list:
+            if e.type == MOUSEBUTTONDOWN and e.button in (4, 5) and e.pos in self:
+                self.scroll(self.WHEEL_LINES if e.button == 4 else -self.WHEEL_LINES)
+
+        return event_or_list
+
+    def _take_pending(self):
+        """Move the appended lines to the ring buffer and return how many there were."""
+        pending = self._pending
+        count = len(pending)
+        lines = self.lines
+        for _ in range(count):
+            lines.append(pending.popleft())
+
+        if count and self._offset:
+            # the view stays on the same lines
+            self.scroll(count)
+        return count
+
+    def needs_redraw(self):
+        return super().needs_redraw() or bool(self._pending)
+
+    def _key(self):
+        """What the whole surface depends on."""
+        return self.size, _font_key(self.font), self.color, self.bg_color, self._offset
+
+    def _new_surface(self):
+        if self.bg_color is None:
+            surf = pygame.Surface(self.size, SRCALPHA)
+            surf.fill((0, 0, 0, 0))
+        else:
+            surf = pygame.Surface(self.size)
+            surf.fill(self.bg_color)
+        return surf
+
+    def _draw_rows(self, first, count):
+        """Draw count rows of the surface, from the row first (0 is the bottom row)."""
+        height = self.font.get_height()
+        bottom = self.height
+        lines = self.lines
+        end = len(lines) - self._offset
+
+        area = pygame.Rect(0, bottom - (first + count) * height, self.width, count * height)
+        self._surface.fill((0, 0, 0, 0) if self.bg_color is None else self.bg_color, area)
+
+        for row in range(first, min(first + count, end)):
+            text, color = lines[end - 1 - row]
+            if text:
+                surf = self.font.render(text, True, color or self.color, self.bg_color)
+                self._surface.blit(surf, (0, bottom - (row + 1) * height))
+
+    def render(self, display):
+        """Draw the new lines on the image of the log, then the image on the display."""
+
+        added = self._take_pending()
+        key = self._key()
+
+        if key != self._drawn or self._surface is None:
+            self._surface = self._new_surface()
+            self._draw_rows(0, self.rows)
+            self._set('_drawn', key)
+
+        elif added and not self._offset:
+            rows = min(added, self.rows)
+            if rows < self.rows:
+                self._surface.scroll(0, -rows * self.font.get_height())
+            self._draw_rows(0, rows)
+
+        display.blit(self._surface, self.topleft)
+
+
+__all__ = ['LogView']
@@ -4,8 +4,6 @@
 
 from math import sqrt
 
-import pygame
-
 
 def fact(n):
     return fact(n - 1) * n if n > 1 else 1
@@ -17,15 +15,92 @@ def comb(n, k):
 
 def merge_rects(rect1, rect2):
     """Return the smallest rect containning two rects"""
-    r = pygame.Rect(rect1)
-    t = pygame.Rect(rect2)
+    # pygame is slow to import, tools that only need the maths don't pay for it
+    from pygame import Rect
+
+    r = Rect(rect1)
+    t = Rect(rect2)
 
     right = max(r.right, t.right)
     bot = max(r.bottom, t.bottom)
     x = min(t.x, r.x)
     y = min(t.y, r.y)
 
-    return pygame.Rect(x, y, right - x, bot - y)
+    return Rect(x, y, right - x, bot - y)
+
+
+def coalesce_rects(rects):
+    """Return a list of rects that do not overlap and cover all the given rects, merging the overlapping ones."""
+    from pygame import Rect
+
+    merged = []
+    for rect in rects:
+        rect = Rect(rect)
+        if not rect.w or not rect.h:
+            continue
+
+        # merging may make the rect overlap others, so we loop until it is alone
+        i = rect.collidelist(merged)
+        while i != -1:
+            rect.union_ip(merged.pop(i))
+            i = rect.collidelist(merged)
+        merged.append(rect)
+
+    return merged
+
+
+def segment_distance(point, start, end):
+    """Return the distance from a point to the segment [start, end]."""
+    px, py = point
+    ax, ay = start
+    dx, dy = end[0] - ax, end[1] - ay
+
+    length = dx * dx + dy * dy
+    if length:
+        t = ((px - ax) * dx + (py - ay) * dy) / length
+        t = min(1, max(0, t))
+        ax += t * dx
+        ay += t * dy
+
+    return sqrt((px - ax) ** 2 + (py - ay) ** 2)
+
+
+def simplify(points, tolerance):
+    """
+    Remove the points of a polyline that are closer than tolerance to the simplified polyline (Ramer-Douglas-Peucker).
+
+    The first and last points are always kept.
+    """
+
+    points = list(points)
+    return [points[i] for i in simplified_indices(points, tolerance)]
+
+
+def simplified_indices(points, tolerance):
+    """Return the indices of the points that simplify() keeps, in order."""
+
+    if len(points) < 3:
+        return list(range(len(points)))
+
+    keep = [False] * len(points)
+    keep[0] = keep[-1] = True
+
+    stack = [(0, len(points) - 1)]
+    while stack:
+        first, last = stack.pop()
+
+        farthest, dist = None, tolerance
+        for i in range(first + 1, last):
+            d = segment_distance(points[i], points[first], points[last])
+            if d > dist:
+                farthest, dist = i, d
+
+        if farthest is not None:
+            keep[farthest] = True
+            stack.append((first, farthest))
+            stack.append((farthest, last))
+
+    return [i for i, k in enumerate(keep) if k]
 
 
 class V2:
@@ -117,4 +192,4 @@ class V2:
         return V2(-self.y / n, self.x / n)
 
 
-__all__ = ['V2', 'merge_rects']
+__all__ = ['V2', 'merge_rects', 'coalesce_rects', 'segment_distance', 'simplify', 'simplified_indices']
@@ -3,7 +3,7 @@ import pygame
 from pygame.constants import *
 
 from GUI.draw import line
-from GUI.font import Font, DEFAULT_FONT
+from GUI.font import Font
 from GUI.geo.basics import Rectangle
 from GUI.base import BaseWidget
 from GUI.colors import mix, bw_contrasted
@@ -66,7 +66,7 @@ class Menu(BaseWidget):
                 (self.width, self.item_size),
                 self._get_color_of_elt(color),
                 self._get_background_color_of_elt(),
-                Font(self.item_size, unit=Font.PIXEL)
+                Font.get(self.item_size, unit=Font.PIXEL)
             ))
 
         return self
@@ -114,7 +114,7 @@ class Menu(BaseWidget):
 
 class MenuElement(SimpleText):
 
-    def __init__(self, name, pos, size, color=BLACK, bg_color=None, font=DEFAULT_FONT):
+    def __init__(self, name, pos, size, color=BLACK, bg_color=None, font=None):
         self.rect = Rectangle(pos, size, bg_color)
 
         self.choosed = False
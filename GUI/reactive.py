@@ -0,0 +1,206 @@
+# coding=utf-8
+
+"""
+Observable values to build layouts that are only recomputed when they change.
+
+Every widget and every `modifier` attribute is a node of a dependency graph. When a `computed` callback
+(pos, size or anchor of a widget) is evaluated, the nodes it reads are recorded as its dependencies.
+Changing a node marks its dependents as maybe changed, and they are recomputed the next time they are read,
+dependencies first, and only if one of their dependencies really changed.
+
+Plain callbacks can read anything, so they can't be tracked: they are polled once per frame.
+"""
+
+from weakref import WeakValueDictionary
+
+# Node states
+CLEAN = 0  # up to date
+CHECK = 1  # a dependency may have changed
+DIRTY = 2  # must be recomputed
+
+_trackers = []
+
+
+class computed:
+    """
+    Wraps a callback that only depends on widgets geometry and modifiers.
+
+    Such a callback is evaluated only when one of its dependencies changes, instead of once per frame.
+    """
+
+    __slots__ = ('func',)
+
+    def __init__(self, func):
+        self.func = func
+
+    def __repr__(self):
+        return '<computed({})>'.format(self.func)
+
+    def __call__(self):
+        return self.func()
+
+
+def is_polled(value):
+    """Return True if the value is a callback that can not be tracked, thus must be evaluated each frame."""
+    return callable(value) and not isinstance(value, computed)
+
+
+class Tracker:
+    """Records the nodes read while evaluating a callback."""
+
+    __slots__ = ('deps', 'volatile')
+
+    def __init__(self):
+        self.deps = {}  # id(node) -> (node, version seen)
+        self.volatile = False
+
+    def __enter__(self):
+        _trackers.append(self)
+        return self
+
+    def __exit__(self, *args):
+        _trackers.pop()
+
+
+class untracked:
+    """Context manager to read nodes without recording them as dependencies."""
+
+    def __enter__(self):
+        _trackers.append(None)
+
+    def __exit__(self, *args):
+        _trackers.pop()
+
+
+def track(node):
+    """Record a read of the node in the current tracker, if any."""
+    tracker = _trackers[-1] if _trackers else None
+    if tracker is not None:
+        tracker.deps[id(node)] = node, node._version
+        if node._volatile:
+            tracker.volatile = True
+
+
+def changed(deps):
+    """Return True if one of the tracked dependencies changed since it was read. Dependencies are brought up to date."""
+    with untracked():
+        for node, version in deps.values():
+            node._refresh()
+            if node._version != version:
+                return True
+    return False
+
+
+def subscribe(node, old_deps, new_deps):
+    """Update the edges of the graph from the old dependencies of a node to its new ones."""
+    key = id(node)
+    for k, (dep, _) in old_deps.items():
+        if k not in new_deps:
+            dep._dependents.pop(key, None)
+    for dep, _ in new_deps.values():
+        dep._dependents[key] = node
+
+
+def invalidate(node):
+    """Mark every node that depends on this one as maybe changed."""
+    stack = list(node._dependents.values())
+    while stack:
+        dep = stack.pop()
+        if dep._mark(CHECK):
+            stack.extend(dep._dependents.values())
+
+
+class Cell:
+    """The value of a modifier for one instance."""
+
+    __slots__ = ('source', 'value', '_version', '_volatile', '_dependents', '__weakref__')
+
+    def __init__(self, source):
+        self.source = source
+        self.value = source() if callable(source) else source
+        self._version = 0
+        self._volatile = is_polled(source)
+        self._dependents = WeakValueDictionary()
+
+    def _refresh(self):
+        if callable(self.source):
+            value = self.source()
+            if value != self.value:
+                self.value = value
+                self._version += 1
+
+    def _mark(self, state):
+        # a cell is never stale, it is evaluated on each read
+        return False
+
+    def get(self):
+        self._refresh()
+        track(self)
+        return self.value
+
+    def set(self, source):
+        self.source = source
+        self._volatile = is_polled(source)
+        value = source() if callable(source) else source
+
+        # a new callback may read other nodes, so the dependents must read it again
+        if value != self.value or callable(source):
+            self.value = value
+            self._version += 1
+            invalidate(self)
+
+
+class modifier:
+    """
+    An observable attribute.
+
+    The value can be a constant or a callable, and the callbacks added with add() are called with
+    the last and the new value each time it changes.
+    Widgets whose computed pos/size/anchor read it are updated when it is set.
+    """
+
+    def __init__(self, value=None, name=None):
+        self.callbacks = []
+        self.default = value
+        self.name = name
+
+    def __set_name__(self, owner, name):
+        self.name = name
+
+    def _cell(self, instance):
+        # a data descriptor has the priority over the instance dict, so we can store the cell under the same name
+        try:
+            return instance.__dict__[self.name]
+        except KeyError:
+            cell = instance.__dict__[self.name] = Cell(self.default)
+            return cell
+
+    def __get__(self, instance, owner):
+        if instance is None:
+            return self
+
+        cell = self._cell(instance)
+        last_value = cell.value
+        value = cell.get()
+        if value != last_value:
+            self.trigger(instance, last_value, value)
+
+        return value
+
+    def __set__(self, instance, value):
+        cell = self._cell(instance)
+        last_value = cell.value
+        cell.set(value)
+        if cell.value != last_value:
+            self.trigger(instance, last_value, cell.value)
+
+    def trigger(self, instance, last_value, value):
+        for call in self.callbacks:
+            call(last_value, value)
+
+    def add(self, callback):
+        self.callbacks.append(callback)
+        return self
+
+
+__all__ = ['computed', 'modifier']
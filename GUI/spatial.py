@@ -0,0 +1,141 @@
+# coding=utf-8
+
+"""
+A spatial index to quickly find the widgets at a given point.
+
+The index is a uniform grid: each cell knows the widgets that overlap it.
+It is updated incrementally: only the widgets that may have moved are checked again.
+"""
+
+import pygame
+
+
+class _Entry:
+    """A widget in the index. It is a dependent of the widget, so it knows when the widget may move."""
+
+    __slots__ = ('widget', 'index', 'order', 'rect', 'cells', '__weakref__')
+
+    def __init__(self, widget, index, order):
+        self.widget = widget
+        self.index = index
+        self.order = order
+        self.rect = None
+        self.cells = ()
+
+    def _mark(self, state):
+        self.index._pending[id(self.widget)] = self
+        return False
+
+
+class SpatialIndex:
+    """A uniform grid of widgets."""
+
+    def __init__(self, cell_size=64):
+        self.cell_size = cell_size
+        self._cells = {}  # (x, y) -> {id(widget): entry}
+        self._entries = {}  # id(widget) -> entry
+        self._pending = {}  # entries that may have moved
+        self._volatile = {}  # entries that must be checked each update
+        self._count = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, widget):
+        return id(widget) in self._entries
+
+    def add(self, widget):
+        """Add a widget to the index. Widgets added later are considered above the others."""
+        entry = _Entry(widget, self, self._count)
+        self._count += 1
+
+        self._entries[id(widget)] = entry
+        widget._dependents[id(entry)] = entry
+        self._place(entry)
+
+    def remove(self, widget):
+        """Remove a widget of the index."""
+        entry = self._entries.pop(id(widget))
+        widget._dependents.pop(id(entry), None)
+        self._pending.pop(id(widget), None)
+        self._volatile.pop(id(widget), None)
+
+        for cell in entry.cells:
+            self._leave(cell, id(widget))
+
+    def order(self, widget):
+        """The position of the widget in the stack, higher is above."""
+        return self._entries[id(widget)].order
+
+    def update(self):
+        """Move the widgets whose geometry changed since the last update."""
+        if self._volatile:
+            self._pending.update(self._volatile)
+
+        pending = self._pending
+        self._pending = {}
+        for entry in pending.values():
+            self._place(entry)
+
+    def _place(self, entry):
+        widget = entry.widget
+        rect = pygame.Rect(widget.topleft, widget.size)
+
+        if widget._volatile:
+            self._volatile[id(widget)] = entry
+        else:
+            self._volatile.pop(id(widget), None)
+
+        if rect == entry.rect:
+            return
+        entry.rect = rect
+
+        cells = self._cells_of(rect)
+        if cells == entry.cells:
+            return
+
+        key = id(widget)
+        for cell in entry.cells:
+            if cell not in cells:
+                self._leave(cell, key)
+        for cell in cells:
+            self._cells.setdefault(cell, {})[key] = entry
+        entry.cells = cells
+
+    def _leave(self, cell, key):
+        bucket = self._cells[cell]
+        del bucket[key]
+        if not bucket:
+            del self._cells[cell]
+
+    def _cells_of(self, rect):
+        size = self.cell_size
+        # widgets contains their right and bottom border
+        return frozenset((x, y)
+                         for x in range(rect.left // size, rect.right // size + 1)
+                         for y in range(rect.top // size, rect.bottom // size + 1))
+
+    def at(self, point):
+        """Return the widgets that contains the point, from the bottom to the top."""
+        x, y = point
+        cell = self._cells.get((x // self.cell_size, y // self.cell_size), {})
+
+        entries = [e for e in cell.values()
+                   if e.rect.left <= x <= e.rect.right and e.rect.top <= y <= e.rect.bottom]
+        entries.sort(key=lambda e: e.order)
+        return [e.widget for e in entries]
+
+    def colliding(self, rect):
+        """Return the widgets that overlap the rect, from the bottom to the top."""
+        rect = pygame.Rect(rect)
+
+        found = {}
+        for cell in self._cells_of(rect):
+            for key, entry in self._cells.get(cell, {}).items():
+                if key not in found and entry.rect.colliderect(rect):
+                    found[key] = entry
+
+        return [e.widget for e in sorted(found.values(), key=lambda e: e.order)]
+
+
+__all__ = ['SpatialIndex']
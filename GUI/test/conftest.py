@@ -0,0 +1,11 @@
+import pytest
+
+from GUI.base import new_frame, reset_frames
+
+
+@pytest.fixture
+def frames():
+    """Run the test in a frame, so the geometry of the widgets is cached, and go back to no frame after."""
+    new_frame()
+    yield
+    reset_frames()
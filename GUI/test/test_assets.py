@@ -0,0 +1,66 @@
+import json
+
+import pygame
+import pytest
+
+from GUI import assets
+from GUI.buttons import IconButton
+
+
+@pytest.fixture
+def icon(tmpdir):
+    assets.image_cache.clear()
+    surf = pygame.Surface((16, 16), pygame.SRCALPHA, 32)
+    surf.fill((200, 100, 50, 255))
+    path = str(tmpdir.join('icon.png'))
+    pygame.image.save(surf, path)
+    return path
+
+
+def test_images_are_shared(icon):
+    buttons = [IconButton(None, (0, 0), 32, icon) for _ in range(10)]
+
+    assert all(b.icon is buttons[0].icon for b in buttons)
+    assert all(b.icon_pressed is buttons[0].icon_pressed for b in buttons)
+    assert buttons[0].icon.get_size() == (32, 32)
+    assert buttons[0].icon_pressed.get_at((0, 0)) == (160, 80, 40, 255)
+    # the file, its scaled image and two effects
+    assert len(assets.image_cache) == 4
+
+
+def test_file_objects_are_not_cached(icon):
+    with open(icon, 'rb') as f:
+        image = assets.load(f, (8, 8), ('brightness', 0.5))
+    assert image.get_size() == (8, 8)
+    assert image.get_at((0, 0)) == (100, 50, 25, 255)
+    assert len(assets.image_cache) == 0
+
+    with open(icon, 'rb') as f:
+        button = IconButton(None, (0, 0), 32, f)
+    assert button.icon_path is f
+    assert button.icon.get_size() == (32, 32)
+    assert button.icon_pressed.get_at((0, 0)) == (160, 80, 40, 255)
+    assert len(assets.image_cache) == 0
+
+
+def test_warm_from_manifest(icon, tmpdir):
+    manifest = str(tmpdir.join('manifest.json'))
+    with open(manifest, 'w') as f:
+        json.dump([icon, [icon, [8, 8], ['brightness', 0.5]]], f)
+
+    assets.warm(manifest).join(10)
+    misses = assets.image_cache.misses
+
+    assets.load(icon, (8, 8), ('brightness', 0.5))
+    assert assets.image_cache.misses == misses
+
+
+def test_budget(icon):
+    assets.image_cache.max_bytes = 100 * 100 * 4
+    try:
+        for size in range(40, 100, 10):
+            assets.load(icon, (size, size))
+        assert assets.image_cache.bytes <= assets.image_cache.max_bytes
+        assert assets.image_cache.evictions
+    finally:
+        assets.image_cache.max_bytes = 32 * 2 ** 20
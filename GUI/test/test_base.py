@@ -262,3 +262,44 @@ def test_click(widget: BaseWidget):
     assert widget.clicked is True
     widget.release()
     assert widget.clicked is False
+
+
+def test_geometry_cached_during_frame(frames):
+    calls = []
+
+    def pos():
+        calls.append(1)
+        return 10, 10
+
+    w = BaseWidget(pos, (10, 10), TOPLEFT)
+
+    assert w.topleft == (10, 10)
+    assert w.center == (15, 15)
+    assert w.width == 10
+    assert len(calls) == 1
+
+    new_frame()
+    assert w.x == 10
+    assert len(calls) == 2
+
+
+def test_invalidate(frames):
+    size = [10, 10]
+    w = BaseWidget((0, 0), lambda: tuple(size), TOPLEFT)
+
+    assert w.bottomright == (10, 10)
+    size[:] = 20, 20
+    assert w.bottomright == (10, 10)
+
+    w.invalidate()
+    assert w.bottomright == (20, 20)
+
+
+def test_set_pos_invalidates(frames, widget2: BaseWidget):
+    assert widget2.topleft == (0, 0)
+
+    widget2.pos = 10, 10
+    assert widget2.topleft == (10, 10)
+
+    widget2.center = 0, 0
+    assert widget2.topleft == (-50, -50)
@@ -0,0 +1,114 @@
+import pytest
+
+from GUI.geo.bezier import Bezier, bernstein_matrix
+from GUI.math import segment_distance
+
+numpy = pytest.importorskip('numpy')
+
+
+def test_bernstein_matrix():
+    matrix = bernstein_matrix(3, 10)
+
+    assert matrix.shape == (10, 4)
+    assert numpy.allclose(matrix.sum(axis=1), 1)
+    assert tuple(matrix[0]) == (1, 0, 0, 0)
+    assert bernstein_matrix(3, 10) is matrix
+
+
+def test_samples():
+    bezier = Bezier((0, 0), (100, 100), [(0, 0), (50, 100), (100, 0)], reso=4)
+
+    assert numpy.allclose(bezier.samples(), [(0, 0), (25, 37.5), (50, 50), (75, 37.5)])
+
+
+def test_pixels_are_unique():
+    bezier = Bezier((0, 0), (100, 100), [(0, 0), (10, 0)], reso=100)
+    ts, pixels = bezier.pixels()
+
+    assert pixels == [(x, 0) for x in range(11)]
+    assert ts[0] == 0
+    assert len(ts) == len(pixels)
+
+
+def test_flatten_is_close_to_the_curve():
+    bezier = Bezier((0, 0), (800, 500), [(40, 40), (100, 400), (200, 100), (650, 420)], reso=1000)
+    polyline = bezier.polyline(0.5)
+
+    assert polyline[0] == (40, 40)
+    assert polyline[-1] == (650, 420)
+    assert len(polyline) < 100
+    segments = list(zip(polyline, polyline[1:]))
+    for p in bezier.samples():
+        assert min(segment_distance(p, a, b) for a, b in segments) <= 0.5
+
+
+def test_flatten_straight_curve():
+    bezier = Bezier((0, 0), (100, 100), [(0, 0), (30, 0), (60, 0), (100, 0)])
+    ts, points = bezier.flatten()
+
+    assert points == [(0, 0), (100, 0)]
+    assert ts == [0, 1]
+
+
+def test_dist_to():
+    bezier = Bezier((0, 0), (100, 100), [(0, 0), (50, 0), (100, 0)])
+
+    assert bezier.dist_to((50, 10)) == pytest.approx(10)
+    assert bezier.dist_to((110, 0)) == pytest.approx(10)
+
+
+def test_control_points_version():
+    bezier = Bezier((0, 0), (100, 100), [(0, 0), (50, 0), (100, 0)])
+    version = bezier.points.version
+
+    bezier.points[1] = (50, 50)
+    assert bezier.points.version != version
+    assert bezier.points[1] == (50, 50)
+
+    version = bezier.points.version
+    bezier.points.append((0, 100))
+    assert bezier.points.version != version
+
+    # a new list never has the version of an old one
+    other = Bezier((0, 0), (100, 100), [(0, 0), (50, 0), (100, 0)])
+    assert other.points.version != bezier.points.version
+
+
+def test_samples_are_cached():
+    bezier = Bezier((0, 0), (100, 100), [(0, 0), (50, 0), (100, 0)])
+
+    assert bezier.samples() is bezier.samples()
+    assert bezier.flatten() is bezier.flatten()
+
+
+def test_samples_incremental_update():
+    points = [(0, 0), (50, 100), (100, 0), (150, 100), (200, 0)]
+    bezier = Bezier((0, 0), (100, 100), points, reso=50)
+    bezier.samples()
+
+    bezier.points[2] = (100, 80)
+    points[2] = (100, 80)
+
+    assert numpy.allclose(bezier.samples(), Bezier((0, 0), (100, 100), points, reso=50).samples())
+
+
+def test_stroke_is_cached():
+    import pygame
+
+    bezier = Bezier((0, 0), (100, 100), [(10, 10), (50, 90), (90, 10)], (255, 0, 0), 4, reso=None)
+    direct = pygame.Surface((100, 100))
+    bezier._stroke(direct, (0, 0), bezier.color)
+
+    surf = pygame.Surface((100, 100))
+    bezier.render(surf)
+    bezier._needs_redraw = False
+    assert not bezier.needs_redraw()
+
+    assert abs(pygame.surfarray.array3d(surf).astype(int) - pygame.surfarray.array3d(direct)).max() <= 2
+
+    sprite = bezier._cache['stroke'][1]
+    bezier.render(surf)
+    assert bezier._cache['stroke'][1] is sprite
+
+    bezier.points[1] = (50, 50)
+    assert bezier.needs_redraw()
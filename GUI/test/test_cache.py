@@ -0,0 +1,56 @@
+import pytest
+
+from GUI.cache import LRUCache
+
+
+@pytest.fixture
+def cache():
+    return LRUCache(10, sizeof=len)
+
+
+def test_get_put(cache: LRUCache):
+    assert cache.get('a') is None
+    cache.put('a', 'xxx')
+    assert cache.get('a') == 'xxx'
+    assert cache.hits == 1
+    assert cache.misses == 1
+    assert cache.bytes == 3
+
+
+def test_evicts_least_recently_used(cache: LRUCache):
+    cache.put('a', 'xxxx')
+    cache.put('b', 'xxxx')
+    cache.get('a')
+    cache.put('c', 'xxxx')
+
+    assert 'a' in cache
+    assert 'b' not in cache
+    assert 'c' in cache
+    assert cache.evictions == 1
+    assert cache.bytes == 8
+
+
+def test_too_big_not_stored(cache: LRUCache):
+    assert cache.put('a', 'x' * 11) == 'x' * 11
+    assert 'a' not in cache
+
+
+def test_get_or_create(cache: LRUCache):
+    calls = []
+
+    def factory():
+        calls.append(1)
+        return 'xx'
+
+    assert cache.get_or_create('a', factory) == 'xx'
+    assert cache.get_or_create('a', factory) == 'xx'
+    assert len(calls) == 1
+
+
+def test_shrink_budget(cache: LRUCache):
+    cache.put('a', 'xxxx')
+    cache.put('b', 'xxxx')
+    cache.max_bytes = 5
+
+    assert len(cache) == 1
+    assert cache.stats()['evictions'] == 1
@@ -0,0 +1,99 @@
+from math import pi
+from random import Random
+
+import pygame
+import pytest
+
+from GUI import draw
+from GUI.locals import GREEN, FLAT, ROUNDED, MITER, BEVEL
+
+numpy = pytest.importorskip('numpy')
+
+
+def alpha(sprite):
+    return pygame.surfarray.array_alpha(sprite).astype(int)
+
+
+def test_ring_coverage():
+    sprite = draw._ring_sprite(20, 5, GREEN)
+    a = alpha(sprite)
+    center = 21
+
+    assert a[center, center] == 0  # the hole
+    assert a[center + 14, center] == 0
+    assert a[center + 15, center] == 255  # in the ring
+    assert a[center + 20, center] == 255
+    assert a[center + 21, center] == 0
+    assert 0 < a[center + 15, center + 14] < 255  # antialiased border
+
+
+def test_ring_arc():
+    full = alpha(draw._ring_sprite(20, 5, GREEN))
+    quarter = alpha(draw._ring_sprite(20, 5, GREEN, (0, pi / 2)))
+
+    # only the top right quarter is drawn
+    assert quarter[21 + 17, 21 - 5] == full[21 + 17, 21 - 5] == 255
+    assert quarter[21 - 17, 21 + 5] == 0
+    assert quarter.sum() < full.sum() / 3
+
+
+def test_ring_fallback_is_close():
+    fast = alpha(draw._ring_sprite(30, 8, GREEN))
+    slow = alpha(draw._ring_sprite_supersampled(30, 8, GREEN))
+
+    assert abs(fast - slow).mean() < 5
+
+
+def test_ring_returns_rect():
+    surf = pygame.Surface((100, 100))
+    rect = draw.ring(surf, (50, 50), 20, 5, GREEN)
+
+    assert rect.center == (50, 50)
+    assert surf.get_at((50 + 17, 50)) == GREEN
+    assert surf.get_at((50, 50)) == (0, 0, 0)
+
+
+def test_polyline_returns_merged_rect():
+    surf = pygame.Surface((200, 200))
+    rect = draw.polyline(surf, [(20, 20), (100, 20), (100, 100)], GREEN, 8)
+
+    assert rect.contains(pygame.Rect(20, 16, 84, 84))
+    assert surf.get_at((60, 20)) == GREEN
+    assert surf.get_at((100, 60)) == GREEN
+    assert surf.get_at((60, 60)) == (0, 0, 0)
+
+
+def test_line_of_length_zero():
+    surf = pygame.Surface((20, 20))
+    rect = draw.line(surf, (5, 5), (5, 5), GREEN, 3)
+
+    assert rect.topleft == (5, 5)
+
+
+def test_translucent_circle_is_blended_once():
+    surf = pygame.Surface((30, 30))
+    surf.fill((255, 255, 255))
+    draw.circle(surf, (15, 15), 10, (0, 255, 0, 128))
+
+    r, g, b, _ = surf.get_at((15, 15))
+    assert abs(r - 127) <= 2 and g == 255 and abs(b - 127) <= 2
+
+    # on the border the coverage and the color are blended together, never the color twice
+    sprite = draw._circle_sprite(10, (0, 255, 0, 128))
+    a = alpha(sprite)
+    assert a.max() in (127, 128)
+    assert (a[a > 0] <= 128).all()
+
+
+def test_polyline_rect_contains_the_drawn_pixels():
+    rng = Random(7)
+    for _ in range(300):
+        surf = pygame.Surface((300, 300), pygame.SRCALPHA)
+        surf.fill((0, 0, 0, 0))
+        points = [(rng.uniform(40, 260), rng.uniform(40, 260)) for _ in range(rng.randint(2, 6))]
+        width = rng.choice([2, 3, 5, 8.5])
+        style = rng.choice([FLAT, ROUNDED])
+        join = rng.choice([MITER, BEVEL, ROUNDED])
+
+        rect = draw.polyline(surf, points, GREEN, width, style, join)
+        assert rect.contains(surf.get_bounding_rect()), (points, width, style, join)
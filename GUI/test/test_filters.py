@@ -0,0 +1,90 @@
+import pygame
+import pytest
+
+from GUI import filters
+from GUI.buttons import IconButton
+
+
+@pytest.fixture
+def image():
+    surf = pygame.Surface((20, 10), pygame.SRCALPHA, 32)
+    surf.fill((200, 100, 50, 255))
+    surf.fill((0, 0, 255, 0), (10, 0, 10, 10))
+    surf.set_at((5, 5), (100, 100, 100, 128))
+    return surf
+
+
+def test_brightness(image):
+    dark = filters.brightness(image, 0.8)
+    bright = filters.brightness(image, 1.5)
+
+    assert dark.get_at((0, 0)) == (160, 80, 40, 255)
+    assert bright.get_at((0, 0)) == (255, 150, 75, 255)
+    assert dark.get_at((5, 5)).a == bright.get_at((5, 5)).a == 128
+    assert dark.get_at((15, 5)).a == 0
+
+
+def test_tint_and_alpha(image):
+    assert filters.tint(image, (255, 0, 0)).get_at((0, 0)) == (200, 0, 0, 255)
+    assert filters.tint(image, (255, 0, 0), 0).get_at((0, 0)) == (200, 100, 50, 255)
+
+    half = filters.alpha_multiply(image, 0.5)
+    assert half.get_at((0, 0)) == (200, 100, 50, 128)
+    assert half.get_at((5, 5)).a == 64
+
+
+def test_surfaces_without_alpha():
+    opaque = pygame.Surface((4, 4), 0, 24)
+    opaque.fill((200, 100, 50))
+    assert filters.alpha_multiply(opaque, 0.5).get_at((0, 0)) == (200, 100, 50, 128)
+
+    palette = pygame.Surface((4, 4), 0, 8)
+    palette.fill((255, 0, 0))
+    color = palette.get_at((0, 0))
+    dark = filters.brightness(palette, 0.5)
+    assert dark.get_bitsize() == 32
+    assert dark.get_at((0, 0)) == (round(color.r * 0.5), 0, 0, 255)
+
+
+def test_colorkey_becomes_transparent():
+    keyed = pygame.Surface((4, 4), 0, 32)
+    keyed.fill((200, 100, 50))
+    keyed.fill((255, 0, 255), (2, 0, 2, 4))
+    keyed.set_colorkey((255, 0, 255))
+
+    for result in (filters.brightness(keyed, 0.5), filters.tint(keyed, (0, 255, 0))):
+        assert result.get_at((0, 0)).a == 255
+        assert result.get_at((3, 0)).a == 0
+
+    assert filters.brightness(keyed, 0.5).get_at((0, 0)) == (100, 50, 25, 255)
+
+
+def test_desaturate(image):
+    pytest.importorskip('numpy')
+
+    grey = filters.desaturate(image)
+    r, g, b, a = grey.get_at((0, 0))
+    assert r == g == b == round(0.299 * 200 + 0.587 * 100 + 0.114 * 50)
+    assert a == 255 and grey.get_at((5, 5)).a == 128
+
+
+def test_blur_keeps_the_colors_of_opaque_pixels(image):
+    pytest.importorskip('numpy')
+
+    for blurred in (filters.box_blur(image, 2), filters.gaussian_blur(image, 1.5)):
+        # the transparent blue does not bleed in
+        r, g, b, a = blurred.get_at((9, 0))
+        assert (r, g, b) == (200, 100, 50)
+        assert 0 < a < 255
+        assert blurred.get_at((0, 0)) == (200, 100, 50, 255)
+        assert blurred.get_at((19, 0)).a == 0
+
+
+def test_icon_button_keeps_the_transparency(image, tmpdir):
+    path = str(tmpdir.join('icon.png'))
+    pygame.image.save(image, path)
+
+    button = IconButton(None, (0, 0), 20, path, 'topleft')
+
+    assert button.icon_pressed.get_at((15, 5)).a == 0
+    assert button.icon_pressed.get_at((0, 0))[:3] == tuple(int(0.8 * c + 0.5) for c in button.icon.get_at((0, 0))[:3])
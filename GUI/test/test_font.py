@@ -0,0 +1,86 @@
+import pytest
+
+from GUI import font as font_module
+from GUI.font import Font, BoldFont, DEFAULT_FONT
+from GUI.text import SimpleText
+
+
+def test_get_shares_the_fonts():
+    font = Font.get(17)
+
+    assert Font.get(17) is font
+    assert Font.get(font.get_height(), unit=Font.PIXEL) is Font.get(Font.px_to_pt(font.get_height()))
+    assert Font.get(18) is not font
+    assert font.resized(18) is Font.get(18)
+
+
+def test_shared_fonts_can_not_change():
+    with pytest.raises(TypeError):
+        Font.get(17).set_size(30)
+    with pytest.raises(TypeError):
+        Font.get(17).set_bold(True)
+
+    font = Font(17)
+    font.set_size(30)
+    assert font.font_size == 30
+
+
+@pytest.mark.parametrize('attr, value', [('bold', True), ('italic', True), ('underline', True),
+                                         ('strikethrough', True), ('point_size', 40)])
+def test_shared_fonts_properties_can_not_change(attr, value):
+    font = Font.get(17)
+    if not hasattr(font, attr):
+        pytest.skip('pygame has no Font.{}'.format(attr))
+
+    with pytest.raises(TypeError):
+        setattr(font, attr, value)
+    assert getattr(font, attr) != value
+
+    own = Font(17)
+    setattr(own, attr, value)
+    assert getattr(own, attr) == value
+
+
+def test_point_size_changes_the_cache_key():
+    from GUI.text import _font_key
+
+    font = Font(17)
+    if not hasattr(font, 'point_size'):
+        pytest.skip('pygame has no Font.point_size')
+
+    key = _font_key(font)
+    font.point_size = 40
+    assert font.font_size == 40
+    assert _font_key(font) != key
+
+    font.point_size = 17
+    font.strikethrough = True
+    assert _font_key(font) != key
+
+
+def test_set_font_size_of_a_text():
+    text = SimpleText('Hello', (0, 0))
+    text.set_font_size(40)
+
+    assert DEFAULT_FONT.font_size == 20
+    assert text.font is Font.get(40)
+
+
+@pytest.mark.parametrize('px', [12, 20, 37, 150, 503])
+def test_px_to_pt_is_exact(px):
+    bold = BoldFont(px, Font.PIXEL)
+
+    for font in (Font(px, unit=Font.PIXEL), bold):
+        assert font.get_height() <= px
+        assert Font(font.font_size + 1, font.font_name).get_height() > px
+
+
+def test_size_table(tmpdir, monkeypatch):
+    table = str(tmpdir.join('sizes.json'))
+    monkeypatch.setattr(Font, 'SIZE_TABLE', table)
+    pt = Font.px_to_pt(33)
+
+    # a new process reads the table instead of measuring
+    monkeypatch.setattr(font_module, '_size_tables', {})
+    monkeypatch.setattr(font_module, '_measure_pt', None)
+    assert Font.px_to_pt(33) == pt
@@ -0,0 +1,35 @@
+from random import Random
+
+from GUI.gapbuffer import GapBuffer
+
+
+def test_edits_match_str():
+    rand = Random(42)
+    buffer = GapBuffer('hello world', gap=2)
+    text = 'hello world'
+
+    for _ in range(500):
+        start = rand.randint(0, len(text))
+        stop = rand.randint(start, len(text))
+        inserted = ''.join(rand.choice('ab ') for _ in range(rand.randint(0, 10)))
+
+        buffer.replace(start, stop, inserted)
+        text = text[:start] + inserted + text[stop:]
+
+        assert str(buffer) == text
+        assert len(buffer) == len(text)
+
+    assert buffer[3:len(text) - 3] == text[3:-3]
+    assert buffer[-1] == text[-1]
+
+
+def test_find():
+    buffer = GapBuffer('one two three')
+    buffer.insert(4, 'and ')
+
+    assert str(buffer) == 'one and two three'
+    assert buffer.find(' ', 4) == 7
+    assert buffer.find('x') == -1
+    assert buffer.rfind(' ', 0, 8) == 7
+    assert buffer.rfind(' ', 0, 3) == -1
+
@@ -0,0 +1,129 @@
+import os
+import stat
+import sys
+
+import pygame
+import pytest
+
+from GUI import latex
+from GUI.locals import BLUE
+from GUI.text import LaText
+
+
+def write_program(folder, name, code):
+    path = os.path.join(folder, name)
+    with open(path, 'w') as f:
+        f.write('#!{}\n{}'.format(sys.executable, code))
+    os.chmod(path, os.stat(path).st_mode | stat.S_IEXEC)
+
+
+@pytest.fixture
+def tex(tmpdir, monkeypatch):
+    """Stub latex and dvipng programs, that log their calls, and an empty cache."""
+    bin_dir = tmpdir.mkdir('bin')
+    calls = tmpdir.join('calls')
+
+    write_program(str(bin_dir), 'latex', """import sys
+open({calls!r}, 'a').write('latex\\n')
+source = open(sys.argv[-1]).read()
+if 'undefined' in source:
+    print('! Undefined control sequence.')
+    sys.exit(1)
+open(sys.argv[-1][:-4] + '.dvi', 'w').write(source)
+""".format(calls=str(calls)))
+    # one image per page, 10 pixels wider than the previous one
+    write_program(str(bin_dir), 'dvipng', """import pygame, sys
+open({calls!r}, 'a').write('dvipng\\n')
+pages = open(sys.argv[-1]).read().count('\\\\newpage') + 1
+for page in range(1, pages + 1):
+    pygame.image.save(pygame.Surface((20 + 10 * page, 12)), sys.argv[sys.argv.index('-o') + 1] % page)
+""".format(calls=str(calls)))
+
+    monkeypatch.setenv('PATH', str(bin_dir) + os.pathsep + os.environ['PATH'])
+    monkeypatch.setattr(latex, 'CACHE_DIR', str(tmpdir.join('cache')))
+    monkeypatch.setattr(latex, '_queue', [])
+    monkeypatch.setattr(latex, '_jobs', {})
+    latex.image_cache.clear()
+
+    return lambda: calls.read().split() if calls.check() else []
+
+
+def test_compile_once(tex):
+    page = latex.equation_page(r'$x^2$', BLUE, 20)
+
+    job = latex.request(page)
+    latex.flush()
+    surface = job.result(10)
+    assert surface.get_size() == (30, 12)
+    assert tex() == ['latex', 'dvipng']
+    assert os.path.exists(latex.cache_path(page))
+
+    # in the memory cache, then on the disk
+    assert latex.request(page).result(0) is surface
+    latex.image_cache.clear()
+    assert latex.request(page).done()
+    assert tex() == ['latex', 'dvipng']
+
+
+def test_latex_error(tex):
+    with pytest.raises(latex.LatexError, match='Undefined control sequence'):
+        job = latex.request(latex.equation_page(r'$\undefined$', BLUE, 20))
+        latex.flush()
+        job.result(10)
+
+
+def test_placeholder_while_compiling(tex):
+    eq = LaText(r'$\pi$', (0, 0))
+    # the source is shown meanwhile
+    assert not eq._compiled
+
+    eq.render(pygame.Surface((100, 100)))
+    eq._job.result(10)
+    assert eq.needs_redraw()
+
+    eq.render(pygame.Surface((100, 100)))
+
+    assert eq._compiled
+    assert eq.size == (30, 12)
+
+    eq.text = r'$\undefined$'
+    eq.render(pygame.Surface((100, 100)))
+    eq._job.exception(10)
+    assert eq.size == (30, 12)
+    eq.render(pygame.Surface((100, 100)))
+
+    # the last good image stays
+    assert isinstance(eq.error, latex.LatexError)
+    assert eq.size == (30, 12)
+
+
+def test_batch(tex):
+    pages = [latex.equation_page('${}$'.format(i), BLUE, 20) for i in range(5)]
+    jobs = [latex.request(page) for page in pages]
+    assert latex.request(pages[0]) is jobs[0]
+    latex.flush()
+
+    assert [job.result(10).get_width() for job in jobs] == [30, 40, 50, 60, 70]
+    assert tex() == ['latex', 'dvipng']
+
+
+def test_batch_with_an_error(tex):
+    pages = [latex.equation_page(source, BLUE, 20) for source in ('$a$', r'$\undefined$', '$b$')]
+    jobs = [latex.request(page) for page in pages]
+    latex.flush()
+
+    assert isinstance(jobs[1].exception(10), latex.LatexError)
+    assert jobs[0].result(10).get_size() == jobs[2].result(10).get_size() == (30, 12)
+
+
+def test_unexpected_error_reaches_the_futures(tex, monkeypatch):
+    def broken(pages, paths):
+        raise ValueError('broken')
+
+    monkeypatch.setattr(latex, 'compile_pages', broken)
+    jobs = [latex.request(latex.equation_page('${}$'.format(i), BLUE, 20)) for i in range(3)]
+    latex.flush()
+
+    for job in jobs:
+        assert isinstance(job.exception(10), ValueError)
+    assert latex._jobs == {}
@@ -0,0 +1,70 @@
+from threading import Thread
+
+import pygame
+
+from GUI.font import Font
+from GUI.locals import BLACK, RED
+from GUI.logview import LogView
+
+
+def test_append_from_threads():
+    log = LogView((0, 0), (200, 100), max_lines=5000)
+
+    def produce(name):
+        for i in range(1000):
+            log.append('{} {}'.format(name, i))
+
+    threads = [Thread(target=produce, args=(name,)) for name in 'abc']
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert log.needs_redraw()
+    log.render(pygame.Surface((200, 100)))
+    assert len(log) == 3000
+    assert not log._pending
+
+
+def test_pending_lines_are_bounded():
+    log = LogView((0, 0), (200, 100), max_lines=10)
+    for i in range(100):
+        log.append(str(i))
+
+    assert len(log._pending) == 10
+    log.render(pygame.Surface((200, 100)))
+    assert [text for text, _ in log.lines] == [str(i) for i in range(90, 100)]
+
+
+def test_scrolled_image_is_the_full_one():
+    font = Font(15)
+    log = LogView((0, 0), (200, 110), max_lines=50, bg_color=BLACK, font=font, anchor='topleft')
+    display = pygame.Surface((200, 110))
+
+    for i in range(20):
+        log.append('line {}'.format(i), RED if i % 3 else None)
+        log.render(display)
+    log.append('two\nlines')
+    log.render(display)
+
+    fresh = LogView((0, 0), (200, 110), max_lines=50, bg_color=BLACK, font=font, anchor='topleft')
+    for text, color in log.lines:
+        fresh.append(text, color)
+    expected = pygame.Surface((200, 110))
+    fresh.render(expected)
+
+    assert pygame.image.tostring(display, 'RGB') == pygame.image.tostring(expected, 'RGB')
+
+
+def test_ring_buffer_and_scroll():
+    log = LogView((0, 0), (200, 100), max_lines=10)
+    for i in range(25):
+        log.append(str(i))
+    log.render(pygame.Surface((200, 100)))
+
+    assert [text for text, _ in log.lines] == [str(i) for i in range(15, 25)]
+
+    log.scroll(100)
+    assert log._offset == len(log) - log.rows
+    log.scroll(-100)
+    assert log._offset == 0
@@ -0,0 +1,39 @@
+import pygame
+
+from GUI.math import coalesce_rects, merge_rects, segment_distance, simplify
+
+
+def test_merge_rects():
+    assert merge_rects((0, 0, 10, 10), (20, 20, 10, 10)) == pygame.Rect(0, 0, 30, 30)
+
+
+def test_coalesce_disjoint():
+    rects = [(0, 0, 10, 10), (20, 0, 10, 10)]
+    assert coalesce_rects(rects) == [pygame.Rect(r) for r in rects]
+
+
+def test_coalesce_overlapping():
+    rects = [(0, 0, 10, 10), (5, 5, 10, 10), (50, 50, 5, 5)]
+    assert sorted(map(tuple, coalesce_rects(rects))) == [(0, 0, 15, 15), (50, 50, 5, 5)]
+
+
+def test_coalesce_chain():
+    # the merge of the last two overlaps the first one
+    rects = [(0, 0, 10, 10), (20, 0, 10, 10), (8, 0, 14, 2)]
+    assert coalesce_rects(rects) == [pygame.Rect(0, 0, 30, 10)]
+
+
+def test_coalesce_ignores_empty():
+    assert coalesce_rects([(0, 0, 0, 10)]) == []
+
+
+def test_segment_distance():
+    assert segment_distance((5, 3), (0, 0), (10, 0)) == 3
+    assert segment_distance((13, 4), (0, 0), (10, 0)) == 5
+    assert segment_distance((3, 4), (0, 0), (0, 0)) == 5
+
+
+def test_simplify():
+    points = [(0, 0), (1, 0.1), (2, -0.1), (3, 0), (3, 5)]
+    assert simplify(points, 0.5) == [(0, 0), (3, 0), (3, 5)]
+    assert simplify(points, 0.01) == points
@@ -0,0 +1,89 @@
+from GUI.base import BaseWidget, new_frame
+from GUI.geo.basics import Line
+from GUI.locals import TOPLEFT
+from GUI.reactive import computed, modifier
+
+
+class Holder:
+    value = modifier((10, 10))
+
+
+def test_modifier_default_and_set():
+    h = Holder()
+    assert h.value == (10, 10)
+
+    h.value = 1, 2
+    assert h.value == (1, 2)
+    assert Holder().value == (10, 10)
+
+
+def test_modifier_callbacks():
+    changes = []
+
+    class A:
+        x = modifier(0).add(lambda last, new: changes.append((last, new)))
+
+    a = A()
+    a.x = 3
+    a.x = 3
+    assert changes == [(0, 3)]
+
+
+def test_computed_only_evaluated_on_change(frames):
+    calls = []
+    a = BaseWidget((0, 0), (10, 10), TOPLEFT)
+
+    def pos():
+        calls.append(1)
+        return a.bottomright
+
+    b = BaseWidget(computed(pos), (5, 5), TOPLEFT)
+
+    assert b.topleft == (10, 10)
+    for _ in range(5):
+        new_frame()
+        assert b.topleft == (10, 10)
+    assert len(calls) == 1
+
+    a.pos = 20, 20
+    assert b.topleft == (30, 30)
+    assert len(calls) == 2
+
+
+def test_propagates_through_chain(frames):
+    a = BaseWidget((0, 0), (10, 10), TOPLEFT)
+    b = BaseWidget(computed(lambda: a.bottomright), (10, 10), TOPLEFT)
+    c = BaseWidget(computed(lambda: b.bottomright), (10, 10), TOPLEFT)
+
+    assert c.topleft == (20, 20)
+    a.size = 20, 20
+    assert c.topleft == (30, 30)
+
+
+def test_modifier_dependency(frames):
+    h = Holder()
+    w = BaseWidget(computed(lambda: h.value), (1, 1), TOPLEFT)
+
+    assert w.topleft == (10, 10)
+    h.value = 42, 0
+    assert w.topleft == (42, 0)
+
+
+def test_depending_on_polled_is_polled(frames):
+    size = [10, 10]
+    a = BaseWidget((0, 0), lambda: tuple(size), TOPLEFT)
+    b = BaseWidget(computed(lambda: a.bottomright), (1, 1), TOPLEFT)
+
+    assert b.topleft == (10, 10)
+    size[:] = 20, 20
+    new_frame()
+    assert b.topleft == (20, 20)
+
+
+def test_line_follows_points():
+    h = Holder()
+    l = Line((0, 0), computed(lambda: h.value))
+
+    assert l.size == (10, 10)
+    h.value = 30, 5
+    assert l.size == (30, 5)
@@ -0,0 +1,67 @@
+import pytest
+
+from GUI.base import BaseWidget
+from GUI.locals import TOPLEFT
+from GUI.spatial import SpatialIndex
+
+
+@pytest.fixture
+def widgets():
+    return [BaseWidget((100 * i, 0), (50, 50), TOPLEFT) for i in range(10)]
+
+
+@pytest.fixture
+def index(widgets):
+    index = SpatialIndex(32)
+    for w in widgets:
+        index.add(w)
+    return index
+
+
+def test_at(index, widgets):
+    assert index.at((10, 10)) == [widgets[0]]
+    assert index.at((150, 50)) == [widgets[1]]
+    assert index.at((75, 10)) == []
+
+
+def test_at_order():
+    index = SpatialIndex()
+    bottom = BaseWidget((0, 0), (100, 100), TOPLEFT)
+    top = BaseWidget((0, 0), (10, 10), TOPLEFT)
+    index.add(top)
+    index.add(bottom)
+
+    assert index.at((5, 5)) == [top, bottom]
+
+
+def test_colliding(index, widgets):
+    assert index.colliding(((0, 0), (260, 10))) == widgets[:3]
+    assert index.colliding(((60, 60), (10, 10))) == []
+
+
+def test_moved_widget(index, widgets):
+    widgets[0].pos = 500, 500
+    index.update()
+
+    assert index.at((10, 10)) == []
+    assert index.at((510, 510)) == [widgets[0]]
+
+
+def test_callback_widget(index):
+    pos = [0, 300]
+    w = BaseWidget(lambda: tuple(pos), (10, 10), TOPLEFT)
+    index.add(w)
+    assert index.at((5, 305)) == [w]
+
+    pos[0] = 300
+    index.update()
+    assert index.at((5, 305)) == []
+    assert index.at((305, 305)) == [w]
+
+
+def test_remove(index, widgets):
+    index.remove(widgets[0])
+
+    assert index.at((10, 10)) == []
+    assert widgets[0] not in index
+    assert len(index) == 9
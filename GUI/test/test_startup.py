@@ -0,0 +1,38 @@
+import subprocess
+import sys
+
+import pytest
+
+import GUI
+
+
+def run(code):
+    """Run python code in a fresh interpreter and return what it prints."""
+    return subprocess.check_output([sys.executable, '-c', code], universal_newlines=True).splitlines()[-1]
+
+
+def test_light_modules_do_not_import_pygame():
+    code = 'import sys, GUI, GUI.locals, GUI.colors, GUI.math; print("pygame" in sys.modules)'
+    assert run(code) == 'False'
+
+
+def test_startup_time():
+    code = ('import time; start = time.perf_counter(); import GUI.locals, GUI.colors, GUI.math; '
+            'print(time.perf_counter() - start)')
+    # pygame alone takes far more, it must not be imported
+    assert float(run(code)) < 0.1
+
+
+def test_default_font_is_loaded_when_used():
+    code = 'from GUI.font import Font; print(len(Font._pool))'
+    assert run(code) == '0'
+    assert GUI.DEFAULT_FONT is GUI.font.default_font()
+
+
+def test_lazy_names():
+    from GUI.buttons import Button
+
+    assert GUI.Button is Button
+    assert 'TextArea' in dir(GUI)
+    with pytest.raises(AttributeError):
+        GUI.not_a_widget
@@ -0,0 +1,250 @@
+import pygame
+import pytest
+
+from GUI.base import new_frame
+from GUI.buttons import SlideBar
+from GUI.font import Font
+from GUI.locals import BLUE, WHITE, RED
+from GUI.text import (SimpleText, TextSource, InLineTextBox, InLinePassBox, TextArea, render_string, text_cache,
+                      wrap_line)
+
+
+@pytest.fixture
+def font():
+    return Font(20)
+
+
+def test_texts_share_their_surface(font):
+    first = SimpleText('Shared', (0, 0), BLUE, font=font)
+    second = SimpleText('Shared', (50, 50), BLUE, font=Font(20))
+
+    assert first._surface is second._surface
+
+
+def test_cache_key(font):
+    surf = render_string(font, 'Key', True, BLUE)
+
+    assert render_string(font, 'Key', True, BLUE) is surf
+    assert render_string(font, 'Key', True, RED) is not surf
+    assert render_string(font, 'Key', True, BLUE, WHITE) is not surf
+    assert render_string(font, 'Key', False, BLUE) is not surf
+
+    font.set_size(30)
+    assert render_string(font, 'Key', True, BLUE) is not surf
+
+
+def test_background_flip_hits_the_cache(font):
+    text = SimpleText('Hover me', (0, 0), BLUE, WHITE, font)
+    text.bg_color = RED
+    hits = text_cache.hits
+
+    text.bg_color = WHITE
+    assert text_cache.hits == hits + 1
+
+
+def test_callable_once_per_frame(font, frames):
+    calls = []
+
+    def get():
+        calls.append(1)
+        return len(calls)
+
+    text = SimpleText(get, (0, 0), BLUE, font=font)
+    count = len(calls)
+    text.render(pygame.Surface((100, 100)))
+    text.needs_redraw()
+    assert len(calls) == count
+
+    new_frame()
+    text.render(pygame.Surface((100, 100)))
+    assert len(calls) == count + 1
+
+
+def test_text_source_invalidate(font):
+    value = ['a']
+    source = TextSource(lambda: value[0])
+    text = SimpleText(source, (0, 0), BLUE, font=font)
+    assert text.text == 'a'
+
+    value[0] = 'b'
+    assert text.text == 'a'
+
+    source.invalidate()
+    assert text.text == 'b'
+
+
+def test_text_source_interval():
+    value = ['a']
+    source = TextSource(lambda: value[0], interval=0)
+
+    version = source.version
+    value[0] = 'b'
+    assert source.version != version
+    assert source() == 'b'
+
+
+def test_slide_bar_label():
+    bar = SlideBar(lambda value: None, (100, 20), (200, 20))
+    assert bar.text_val.text == '0'
+
+    bar.set(42)
+    assert bar.text_val.text == '42'
+
+
+def type_text(box, text):
+    for letter in text:
+        box.add_letter(letter)
+
+
+def test_cursor_widths_follow_the_edits(font):
+    box = InLineTextBox((0, 0), 500, font=font)
+    type_text(box, 'Hello World')
+    box.cursor = 5
+    box.delete_one_letter(box.LEFT)
+    box.delete_one_word(box.RIGHT)
+    type_text(box, ' AVA fj')
+
+    text = box.text
+    fresh = InLineTextBox((0, 0), 500, font=font)
+    fresh.text = text
+
+    assert box._widths() == fresh._widths()
+    for i, x in enumerate(box._widths()):
+        assert abs(x - font.size(text[:i])[0]) <= 2
+
+
+def test_cursor_at(font):
+    box = InLineTextBox((0, 0), 500, font=font, anchor='topleft')
+    type_text(box, 'abc def')
+    widths = box._widths()
+
+    assert box.cursor_at(-10) == 0
+    assert box.cursor_at(1000) == 7
+    assert box.cursor_at(widths[3] + 1) == 3
+    assert box.cursor_at(widths[3] - 1) == 3
+
+
+def test_pass_box_widths(font):
+    box = InLinePassBox((0, 0), 500, font=font)
+    type_text(box, 'secret')
+    box.delete_one_letter(box.LEFT)
+
+    assert box._widths()[-1] == font.size(box.shawn_text)[0]
+
+
+def test_long_text_renders_the_view_only(font):
+    box = InLineTextBox((0, 0), 100, font=font, anchor='topleft')
+    box.text = 'word ' * 2000
+    box.cursor = len(box)
+    box.add_letter('!')
+
+    display = pygame.Surface((200, 50))
+    box.render(display)
+
+    assert box.text == 'word ' * 2000 + '!'
+    assert box.left <= box.cursor_pos() <= box.right
+
+    # only the end of the text is rendered: what fits in the box and a few characters around
+    _, first, last, _ = box._view
+    assert last == len(box)
+    assert last - first <= box.width // font.size(' ')[0] + 2 * box.VIEW_MARGIN + 2
+    assert box._surface.get_width() == font.size(box.text[first:last])[0]
+    assert box._surface.get_width() < box.width + 2 * box.VIEW_MARGIN * font.size('w')[0]
+
+
+def test_typed_text_is_one_edit(font):
+    box = InLineTextBox((0, 0), 100, font=font)
+    edits = box._edits
+
+    events = [pygame.event.Event(pygame.TEXTINPUT, text=c) for c in 'abc' * 1000]
+    box.update(events)
+
+    assert box.text == 'abc' * 1000
+    assert box.cursor == 3000
+    assert box._edits == edits + 1
+
+
+def key(char, code=None):
+    return pygame.event.Event(pygame.KEYDOWN, key=code or ord(char), mod=0, unicode=char)
+
+
+def text_input(text):
+    return pygame.event.Event(pygame.TEXTINPUT, text=text)
+
+
+def test_typed_text_keeps_the_order_of_the_keys(font):
+    box = InLineTextBox((0, 0), 100, font=font)
+
+    # SDL sends the KEYDOWN of a letter, then its TEXTINPUT
+    box.update([key('a'), text_input('a'), key('b'), text_input('b'), key('c'), text_input('c'),
+                key('\b', pygame.K_BACKSPACE), key('d'), text_input('d')])
+
+    assert box.text == 'abd'
+
+
+def test_first_typed_letter_is_inserted_once(font):
+    box = InLineTextBox((0, 0), 100, font=font)
+
+    box.update([key('a'), text_input('a')])
+    assert box.text == 'a'
+    box.update([key('b'), text_input('b')])
+    assert box.text == 'ab'
+
+
+def test_typed_text_without_text_input(font):
+    box = InLineTextBox((0, 0), 100, font=font)
+
+    box.update([key('a'), key('b')])
+    assert box.text == 'ab'
+
+
+def test_insert_text(font):
+    box = InLineTextBox((0, 0), 100, font=font)
+    box.insert_text('one\ntwo\x00')
+    box.cursor = 3
+    box.insert_text(',')
+
+    assert box.text == 'one, two'
+    assert box.cursor == 4
+
+
+def test_wrap_line(font):
+    text = 'the quick brown fox jumps over the lazy dog ' * 3 + 'x' * 100
+    rows = wrap_line(font, text, 120)
+    ends = rows[1:] + (len(text),)
+
+    assert rows[0] == 0
+    for start, end in zip(rows, ends):
+        assert font.size(text[start:end].rstrip(' '))[0] <= 120
+    assert text[rows[1] - 1] == ' '
+
+
+def test_text_area_lines_follow_the_edits(font):
+    area = TextArea((0, 0), (200, 100), font=font)
+    area.text = '\n'.join('line {}'.format(i) for i in range(1000))
+    area.cursor = area._line_start(500) + 2
+    area.insert_text('new\nlines\r\n')
+    area.cursor = area._line_start(10)
+    area.delete_one_letter(area.LEFT)
+    area.cursor = 0
+    area.insert_text('first\n')
+
+    lines = area.text.split('\n')
+    assert area.line_count == len(lines)
+    assert [area.line(i) for i in range(len(lines))] == lines
+
+
+def test_text_area_renders_the_view_only(font):
+    area = TextArea((0, 0), (200, 100), font=font, anchor='topleft')
+    area.text = 'word ' * 5000 + '\n' * 100000
+    area.focus()
+    area.cursor = len(area)
+
+    area.render(pygame.Surface((200, 100)))
+
+    assert len(area._visible()) == area.visible_rows
+    assert area._row_of(area.cursor) in area._visible()
+    assert area.cursor_pos()[1] < area.bottom
+
+    area.move_cursor_one_row(-1)
+    assert area.cursor == len(area) - 1
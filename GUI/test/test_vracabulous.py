@@ -1,7 +1,11 @@
+import os
 from random import shuffle
 
+import pygame
 import pytest
+from pygame.constants import KEYDOWN, K_a, MOUSEBUTTONDOWN, MOUSEBUTTONUP, MOUSEMOTION
 
+from GUI.base import BaseWidget
 from GUI.geo.basics import Rectangle
 from GUI.vracabulous import *
 from GUI.locals import *
@@ -139,3 +143,187 @@ def test_mul_and_rmul(sep2):
 def test_div(sep2):
     assert sep2 / 2 == (1.5, 2)
     assert isinstance(sep2, Separator)
+
+
+# ------------------------------ Testing Window -------------------------------- #
+
+class Probe(BaseWidget):
+    """A widget that remembers the events it receives and how often it is drawn."""
+
+    def __init__(self, pos, size):
+        super().__init__(pos, size, TOPLEFT)
+        self.received = []
+        self.drawn = 0
+
+    def update(self, event_or_list):
+        event_or_list = super().update(event_or_list)
+        self.received.append(list(event_or_list))
+        return event_or_list
+
+    def render(self, surf):
+        self.drawn += 1
+        surf.fill(BLACK, self)
+
+
+@pytest.fixture
+def display(monkeypatch):
+    monkeypatch.setenv('SDL_VIDEODRIVER', os.environ.get('SDL_VIDEODRIVER', 'dummy'))
+    pygame.display.init()
+
+
+@pytest.fixture
+def window(display):
+    return Window()
+
+
+def motion(pos):
+    return pygame.event.Event(MOUSEMOTION, pos=pos, rel=(0, 0), buttons=(0, 0, 0))
+
+
+def button(kind, pos):
+    return pygame.event.Event(kind, pos=pos, button=1)
+
+
+def frame(window, *events):
+    """Send the events to the widgets like Window.update()."""
+    window._index.update()
+    window.dispatch(list(events))
+
+
+def test_widgets_at_and_in(window):
+    a = window.add(Probe((0, 0), (100, 100)))
+    b = window.add(Probe((50, 50), (100, 100)))
+    hidden = window.add(Probe((60, 60), (10, 10)), lambda: False)
+
+    assert window.widgets_at((10, 10)) == [a]
+    assert window.widgets_at((65, 65)) == [a, b]
+    assert window.widgets_at((500, 400)) == []
+
+    assert window.widgets_in(pygame.Rect(120, 120, 10, 10)) == [b]
+    assert window.widgets_in(pygame.Rect(0, 0, 300, 300)) == [a, b]
+    assert hidden not in window.widgets_in(window.screen.get_rect())
+
+
+def test_dispatch_updates_every_widget_each_frame(window):
+    a = window.add(Probe((0, 0), (100, 100)))
+    b = window.add(Probe((200, 200), (100, 100)))
+    hidden = window.add(Probe((0, 0), (10, 10)), lambda: False)
+
+    frame(window)
+    assert a.received == b.received == [[]]
+
+    key = pygame.event.Event(KEYDOWN, key=K_a, mod=0, unicode='a')
+    frame(window, key)
+    assert a.received[-1] == b.received[-1] == [key]
+    assert hidden.received == []
+
+
+def test_dispatch_pointer_events_to_the_widgets_under(window):
+    a = window.add(Probe((0, 0), (100, 100)))
+    b = window.add(Probe((200, 200), (100, 100)))
+
+    move = motion((10, 10))
+    key = pygame.event.Event(KEYDOWN, key=K_a, mod=0, unicode='a')
+    frame(window, move, key)
+
+    assert a.received == [[move, key]]
+    # b is still updated, without the motion
+    assert b.received == [[key]]
+
+
+def test_dispatch_hovered_widget_sees_the_pointer_leave(window):
+    a = window.add(Probe((0, 0), (100, 100)))
+
+    frame(window, motion((10, 10)))
+    leave = motion((500, 400))
+    frame(window, leave)
+    assert a.received[-1] == [leave]
+
+    frame(window, motion((500, 300)))
+    assert a.received[-1] == []
+
+
+def test_dispatch_grabbed_widget_gets_the_release(window):
+    a = window.add(Probe((0, 0), (100, 100)))
+    b = window.add(Probe((200, 200), (100, 100)))
+
+    frame(window, button(MOUSEBUTTONDOWN, (10, 10)))
+    frame(window, motion((250, 250)))
+    release = button(MOUSEBUTTONUP, (250, 250))
+    frame(window, release)
+
+    assert a.received[-1] == b.received[-1] == [release]
+
+    # the grab ends with the release
+    frame(window, motion((260, 260)))
+    assert a.received[-1] == []
+
+
+def test_dispatch_focused_widget_gets_the_pointer(window):
+    a = window.add(Probe((0, 0), (100, 100)))
+    a.focus()
+
+    move = motion((500, 400))
+    frame(window, move)
+    assert a.received == [[move]]
+    a.unfocus()
+
+
+class DirtyWindow(Window):
+    DIRTY_RECTS = True
+    DIRTY_MARGIN = 4
+
+
+@pytest.fixture
+def dirty(display):
+    dirty = DirtyWindow()
+    a = dirty.add(Probe((0, 0), (50, 50)))
+    b = dirty.add(Probe((300, 300), (50, 50)))
+    dirty.render()
+    dirty._damaged = []  # sent to the display by update_screen()
+    return dirty, a, b
+
+
+def test_dirty_rects_first_frame_is_full(display):
+    dirty = DirtyWindow()
+    a = dirty.add(Probe((0, 0), (50, 50)))
+    dirty.render()
+
+    assert dirty._damaged == [dirty.screen.get_rect()]
+    assert a.drawn == 1 and not a.needs_redraw()
+
+
+def test_dirty_rects_moved_widget(dirty):
+    window, a, b = dirty
+    b.pos = (100, 300)
+    window.render()
+
+    # the old and the new place of b, with the margin
+    assert sorted(map(tuple, window._damaged)) == [(96, 296, 58, 58), (296, 296, 58, 58)]
+    assert b.drawn == 2
+    assert a.drawn == 1
+
+
+def test_dirty_rects_changed_widget(dirty):
+    window, a, b = dirty
+    b.color = RED
+    window.render()
+
+    assert window._damaged == [pygame.Rect(296, 296, 58, 58)]
+    assert (a.drawn, b.drawn) == (1, 2)
+    assert not b.needs_redraw()
+
+    # nothing changed
+    window._damaged = []
+    window.render()
+    assert window._damaged == []
+    assert (a.drawn, b.drawn) == (1, 2)
+
+
+def test_dirty_rects_overlapping_damage_is_merged(dirty):
+    window, a, b = dirty
+    b.pos = (310, 300)
+    window.render()
+
+    assert window._damaged == [pygame.Rect(296, 296, 68, 58)]
+    assert a.drawn == 1
@@ -3,40 +3,177 @@
 """
 A module to easily render text on the screen.
 """
-import os
 import pygame
-import tempfile
+from bisect import bisect
+from itertools import accumulate, chain
 from random import randint
+from time import monotonic
 from pygame.locals import *
 
 
 from GUI.locals import *
 from GUI.draw import line
-from GUI.font import DEFAULT_FONT
-from GUI.base import BaseWidget
+from GUI.font import default_font
+from GUI import latex
+from GUI.base import BaseWidget, current_frame
+from GUI.cache import LRUCache
+from GUI.gapbuffer import GapBuffer
 
 pygame.font.init()
 
+# the rendered strings, shared by every text widget
+text_cache = LRUCache(4 * 2 ** 20)
+# (font, width, line) -> the start of the rows of the line wrapped in this width
+wrap_cache = LRUCache(2 ** 20, sizeof=lambda rows: 8 * len(rows) + 64)
+
+
+def _font_key(font):
+    """The file, size and style of a font, or the font itself if we don't know its file."""
+    file = getattr(font, 'font_name', None)
+    if file is None:
+        return font
+    return (file, font.font_size, font.get_bold(), font.get_italic(), font.get_underline(),
+            getattr(font, 'strikethrough', False))
+
+
+def clipboard_text():
+    """Return the text in the clipboard, or '' if there is none or the clipboard can't be used."""
+    try:
+        if not pygame.scrap.get_init():
+            pygame.scrap.init()
+
+        get_text = getattr(pygame.scrap, 'get_text', None)
+        if get_text is not None:
+            return get_text() or ''
+
+        text = pygame.scrap.get(SCRAP_TEXT)
+    except pygame.error:  # no display or no clipboard support
+        return ''
+
+    if not text:
+        return ''
+    return text.decode('utf-8', 'ignore').rstrip('\0')
+
+
+def wrap_line(font, text, width):
+    """
+    Return the index of the first character of each row of the text wrapped in width pixels.
+
+    The rows are cut after a space when possible and have at least one character.
+    """
+
+    rows = [0]
+    start = 0
+    # a character is at least one pixel wide, so a row can not be longer than width
+    while len(text) - start > width or font.size(text[start:])[0] > width:
+        lo, hi = start + 1, min(len(text), start + max(width, 1))
+        while lo < hi:
+            mid = (lo + hi + 1) // 2
+            if font.size(text[start:mid])[0] <= width:
+                lo = mid
+            else:
+                hi = mid - 1
+
+        # the space at the end of a row can go out of the box
+        space = text.rfind(' ', start, lo + 1)
+        end = space + 1 if space > start else lo
+        if end >= len(text):
+            break
+
+        rows.append(end)
+        start = end
+
+    return tuple(rows)
+
+
+def render_string(font, text, antialias, color, bg_color=None):
+    """
+    Render a string like Font.render(), but only once for every text widget: the surface is kept in text_cache.
+
+    The surfaces are shared, so they must not be modified.
+    """
+
+    key = (_font_key(font), text, antialias, tuple(color), None if bg_color is None else tuple(bg_color))
+    return text_cache.get_or_create(key, lambda: font.render(text, antialias, color, bg_color))
+
+
+class TextSource:
+    """
+    A text computed by a function that is only called when the text may have changed.
+
+    The function is called again after invalidate(), or once `interval` seconds passed since its last call.
+    A text widget only asks a TextSource for its text when its version changed.
+
+    Any object with a `version` attribute and that returns the text when called can be used the same way.
+    """
+
+    def __init__(self, func, interval=None):
+        """
+        :param func: a function that takes no arguments and returns the text
+        :param interval: if not None, the text is also refreshed when this number of seconds passed
+        """
+
+        self.func = func
+        self.interval = interval
+        self._text = ''
+        self._version = 0
+        self._stale = True
+        self._last_call = None
+
+    def __repr__(self):
+        return '<TextSource({})>'.format(self.func)
+
+    def invalidate(self):
+        """Tell that the text changed. The function will be called the next time the text is needed."""
+        self._stale = True
+
+    @property
+    def version(self):
+        """A stamp that changes each time the text changes."""
+        self._refresh()
+        return self._version
+
+    def __call__(self):
+        self._refresh()
+        return self._text
+
+    def _refresh(self):
+        now = monotonic()
+        if not self._stale and (self.interval is None or now - self._last_call < self.interval):
+            return
+
+        text = str(self.func())
+        self._stale = False
+        self._last_call = now
+
+        if text != self._text:
+            self._text = text
+            self._version += 1
+
 
 class SimpleText(BaseWidget):
     """A simple brut text to draw on the screen"""
 
-    def __init__(self, text, pos, color=BLUE, bg_color=None, font=DEFAULT_FONT, anchor='center'):
+    _text_value = ''  # the last text evaluated
+    _text_stamp = None  # the frame or version of the source when it was evaluated
+
+    def __init__(self, text, pos, color=BLUE, bg_color=None, font=None, anchor='center'):
         """
         Creates a new SimpleText object.
         
-        :param text: The string or a callable (no args) that returns the string to dislay
+        :param text: The string or a callable (no args) that returns the string to dislay.
+            A callable is evaluated at most once per frame, or only when its version changes for a TextSource.
         :param pos: the position of the text
         :param color: the color of the text
         :param bg_color: the background color of the text
-        :param font: a pygame.Font object
+        :param font: a pygame.Font object, DEFAULT_FONT if None
         :param anchor: the anchor of the text.
             See http://www.pygame.org/docs/ref/rect.html#pygame.Rect for a list of possible anchors.
         """
 
         super().__init__(pos, (0, 0), anchor)
 
-        self.font = font
+        self.font = default_font() if font is None else font
         self._color = color
         self._bg_color = bg_color
         self._last_text = ...
@@ -54,14 +191,30 @@ class SimpleText(BaseWidget):
     @property
     def text(self):
         """Return the string to render."""
-        if callable(self._text):
-            return str(self._text())
-        return str(self._text)
+        source = self._text
+        if not callable(source):
+            return str(source)
+
+        version = getattr(source, 'version', None)
+        if version is not None:
+            stamp = 'version', version
+        else:
+            # without frame clock, we can not know when it changes
+            frame = current_frame()
+            stamp = None if frame is None else ('frame', frame)
+
+        if stamp is None or stamp != self._text_stamp:
+            # the bookkeeping must not mark the widget as changed
+            self._set('_text_value', str(source()))
+            self._set('_text_stamp', stamp)
+
+        return self._text_value
 
     @text.setter
     def text(self, value):
         """Set the text to a new string or callable."""
         self._text = value
+        self._set('_text_stamp', None)
 
     @property
     def color(self):
@@ -88,9 +241,17 @@ class SimpleText(BaseWidget):
             self._bg_color = value
             self._render()
 
+    def needs_redraw(self):
+        """Return True if the text changed since it was last drawn by a Window."""
+        return super().needs_redraw() or self.text != self._last_text
+
     def set_font_size(self, pt=None, px=None):
         """Set the font size to the desired size, in pt or px."""
-        self.font.set_size(pt, px)
+        if getattr(self.font, 'shared', False):
+            # the font is used by other widgets too
+            self.font = self.font.resized(pt, px)
+        else:
+            self.font.set_size(pt, px)
 
         self._render()
 
@@ -103,11 +264,15 @@ class SimpleText(BaseWidget):
 
         self._last_text = self.text
 
-        self._surface = self.font.render(self.text, True, self.color, self.bg_color)
+        self._surface = self._render_string(self.text)
         rect = self._surface.get_rect()
 
         self.size = rect.size
 
+    def _render_string(self, text):
+        """Return a surface with the string in the font and colors of the widget, see render_string()."""
+        return render_string(self.font, text, True, self.color, self.bg_color)
+
     def render(self, display):
         """Render basicly the text."""
         # to handle changing objects / callable
@@ -119,12 +284,20 @@ class SimpleText(BaseWidget):
 
 class InLineTextBox(SimpleText):
 
-    """A textbox with scrolling in one line"""
+    """
+    A textbox with scrolling in one line
+
+    The text is kept in a GapBuffer and only the characters in view are rendered,
+    so long texts stay fast to edit.
+    """
 
     RIGHT = 1
     LEFT = -1
 
-    def __init__(self, pos, size, color=BLUE, bg_color=None, font=DEFAULT_FONT, anchor='center', default_text=''):
+    # the number of characters rendered on each side of the view
+    VIEW_MARGIN = 2
+
+    def __init__(self, pos, size, color=BLUE, bg_color=None, font=None, anchor='center', default_text=''):
         """
         Creates a new InLineTextBox object.
 
@@ -134,19 +307,55 @@ class InLineTextBox(SimpleText):
         :size: The maximum width the text can take. This is the width of the textbox
         :param color: the color of the text
         :param bg_color: the background color of the text
-        :param font: a pygame.Font object
+        :param font: a pygame.Font object, DEFAULT_FONT if None
         :param anchor: the anchor of the text.
             See http://www.pygame.org/docs/ref/rect.html#pygame.Rect for a list of possible anchors.
         """
 
+        if font is None:
+            font = default_font()
         self.default_text = font.render(default_text, True, LIGHT_GREY, bg_color)
 
+        self._buffer = GapBuffer()
+        self._edits = 0  # the number of changes of the text
+        self._string = ''  # the text as a str, None when it must be joined again
+
+        # the width each character adds to the text, and their sums: the x of the cursor at each index
+        self._advances = None
+        self._prefix = None
+        self._pairs = {}
+        self._pairs_font = None
+
+        self._scroll = 0  # the number of pixels of text hidden on the left
+        self._view = None  # what is rendered in _surface: (edits, first char, last char, font)
+        self._view_x = 0  # the x of the first rendered character in the text
+        self._cursor = 0
+        self._text_input = False  # whether we received TEXTINPUT events, that replace the unicode of KEYDOWN
+
         super().__init__('', pos, color, bg_color, font, anchor)
         self.size = size, 42
-        self._cursor = 0
 
         self._render()
 
+    def __len__(self):
+        return len(self._buffer)
+
+    @property
+    def text(self):
+        """Return the string in the box."""
+        if self._string is None:
+            self._set('_string', str(self._buffer))
+        return self._string
+
+    @text.setter
+    def text(self, value):
+        """Set the text to a new string. The widths of the characters are measured again."""
+        self._buffer = GapBuffer(str(value))
+        self._set('_string', None)
+        self._set('_edits', self._edits + 1)
+        self._set('_advances', None)
+        self._set('_prefix', None)
+
     @property
     def cursor(self):
         """The position of the cursor in the text."""
@@ -167,19 +376,103 @@ class InLineTextBox(SimpleText):
         else:
             self._cursor = value
 
+    def _shown(self, start, stop):
+        """The displayed characters from start to stop."""
+        return self._buffer[start:stop]
+
+    def _advance(self, previous, char):
+        """The width a character adds after the previous one (empty at the start), kerning included."""
+        try:
+            return self._pairs[previous, char]
+        except KeyError:
+            pass
+
+        if previous:
+            width = self.font.size(previous + char)[0] - self.font.size(previous)[0]
+        else:
+            width = self.font.size(char)[0]
+
+        self._pairs[previous, char] = width
+        return width
+
+    def _measure(self, start, stop):
+        """The advances of the displayed characters from start to stop."""
+        shown = self._shown(start, stop)
+        previous = self._shown(start - 1, start) if start else ''
+        return [self._advance(p, c) for p, c in zip([previous] + list(shown), shown)]
+
+    def _widths(self):
+        """The x of the cursor before each character of the displayed text, and after the last one."""
+        font = _font_key(self.font)
+        if font != self._pairs_font:
+            self._set('_pairs', {})
+            self._set('_pairs_font', font)
+            self._set('_advances', None)
+
+        if self._prefix is None:
+            if self._advances is None:
+                self._set('_advances', self._measure(0, len(self)))
+
+            self._set('_prefix', [0] + list(accumulate(self._advances)))
+
+        return self._prefix
+
+    def _edited(self, start, removed, inserted):
+        """Update the widths after `removed` characters at start were replaced by `inserted` ones."""
+        self._set('_string', None)
+        self._set('_edits', self._edits + 1)
+        self._set('_prefix', None)
+        self._needs_redraw = True
+
+        if self._advances is None:
+            return
+
+        stop = start + inserted
+        # the character after the edit has a new neighbour, so its width changes too
+        end = min(stop + 1, len(self))
+
+        self._advances[start:start + removed + end - stop] = self._measure(start, end)
+
+    def _replace(self, start, end, string):
+        """Replace the characters from start to end by the string."""
+        self._buffer.replace(start, end, string)
+        self._edited(start, end - start, len(string))
+
+    def _shift(self):
+        """The number of pixels of text hidden on the left, such that the cursor is visible."""
+        widths = self._widths()
+        x = widths[self.cursor]
+
+        scroll = self._scroll
+        if x - scroll > self.width:
+            scroll = x - self.width
+        elif x < scroll:
+            scroll = x
+        # no empty space on the right when the text is wider than the box
+        scroll = max(0, min(scroll, widths[-1] - self.width))
+
+        self._set('_scroll', scroll)
+        return scroll
+
     def cursor_pos(self):
         """The cursor position in pixels."""
 
         if len(self) == 0:
             return self.left + self.default_text.get_width()
 
-        papy = self._surface.get_width()
-        if papy > self.w:
-            shift = papy - self.width
-        else:
-            shift = 0
+        return self.left + self._widths()[self.cursor] - self._shift()
+
+    def cursor_at(self, x):
+        """The index of the cursor closest to the x coordinate on the screen."""
+        widths = self._widths()
+        x = x - self.left + self._shift()
 
-        return self.left + self.font.size(self.text[:self.cursor])[0] - shift
+        i = bisect(widths, x)
+        if i == 0:
+            return 0
+        if i == len(widths):
+            return i - 1
+        return i if widths[i] - x < x - widths[i - 1] else i - 1
 
     def move_cursor_one_letter(self, letter=RIGHT):
         """Move the cursor of one letter to the right (1) or the the left."""
@@ -187,7 +480,7 @@ class InLineTextBox(SimpleText):
 
         if letter == self.RIGHT:
             self.cursor += 1
-            if self.cursor > len(self.text):
+            if self.cursor > len(self):
                 self.cursor -= 1
         else:
             self.cursor -= 1
@@ -200,12 +493,12 @@ class InLineTextBox(SimpleText):
         assert word in (self.RIGHT, self.LEFT)
 
         if word == self.RIGHT:
-            papy = self.text.find(' ', self.cursor) + 1
+            papy = self._buffer.find(' ', self.cursor) + 1
             if not papy:
                 papy = len(self)
             self.cursor = papy
         else:
-            papy = self.text.rfind(' ', 0, self.cursor)
+            papy = self._buffer.rfind(' ', 0, self.cursor)
             if papy == -1:
                 papy = 0
             self.cursor = papy
@@ -216,12 +509,13 @@ class InLineTextBox(SimpleText):
         assert letter in (self.RIGHT, self.LEFT)
 
         if letter == self.LEFT:
-            papy = self.cursor
-            self.text = self.text[:self.cursor - 1] + self.text[self.cursor:]
-            self.cursor = papy - 1
+            if self.cursor > 0:
+                papy = self.cursor
+                self._replace(self.cursor - 1, self.cursor, '')
+                self.cursor = papy - 1
 
-        else:
-            self.text = self.text[:self.cursor] + self.text[self.cursor + 1:]
+        elif self.cursor < len(self):
+            self._replace(self.cursor, self.cursor + 1, '')
 
     def delete_one_word(self, word=RIGHT):
         """Delete one word the right or the the left of the cursor."""
@@ -229,16 +523,16 @@ class InLineTextBox(SimpleText):
         assert word in (self.RIGHT, self.LEFT)
 
         if word == self.RIGHT:
-            papy = self.text.find(' ', self.cursor) + 1
+            papy = self._buffer.find(' ', self.cursor) + 1
             if not papy:
-                papy = len(self.text)
-            self.text = self.text[:self.cursor] + self.text[papy:]
+                papy = len(self)
+            self._replace(self.cursor, papy, '')
 
         else:
-            papy = self.text.rfind(' ', 0, self.cursor)
+            papy = self._buffer.rfind(' ', 0, self.cursor)
             if papy == -1:
                 papy = 0
-            self.text = self.text[:papy] + self.text[self.cursor:]
+            self._replace(papy, self.cursor, '')
             self.cursor = papy
 
     def add_letter(self, letter):
@@ -246,76 +540,140 @@ class InLineTextBox(SimpleText):
         assert isinstance(letter, str)
         assert len(letter) == 1
 
-        self.text = self.text[:self.cursor] + letter + self.text[self.cursor:]
-        self.cursor += 1
+        self.insert_text(letter)
+
+    def insert_text(self, text):
+        """
+        Insert a string at the cursor pos, in one edit.
+
+        Line breaks and tabs become spaces and the other non printable characters are dropped.
+        """
+
+        text = ''.join(c if c.isprintable() else ' ' for c in text if c.isprintable() or c in '\t\r\n')
+        if not text:
+            return
+
+        self._replace(self.cursor, self.cursor, text)
+        self.cursor += len(text)
 
     def clear(self):
         self.text = ''
         self._render()
 
     def update(self, event_or_list):
-        """Update the text and position of cursor according to the event passed."""
+        """
+        Update the text and position of cursor according to the event passed.
+
+        The characters typed or pasted between other events are inserted together, in one edit.
+        """
 
         event_or_list = super().update(event_or_list)
 
+        # with text input, the characters also come with their KEYDOWN, sent before the TEXTINPUT,
+        # so we must know it before the first KEYDOWN to keep only the TEXTINPUT
+        if not self._text_input and any(e.type == TEXTINPUT for e in event_or_list):
+            self._set('_text_input', True)
+
+        typed = []
         for e in event_or_list:
+            if e.type == TEXTINPUT:
+                typed.append(e.text)
+                continue
+
             if e.type == KEYDOWN:
-                if e.key == K_RIGHT:
-                    if e.mod * KMOD_CTRL:
-                        self.move_cursor_one_word(self.RIGHT)
-                    else:
-                        self.move_cursor_one_letter(self.RIGHT)
-
-                elif e.key == K_LEFT:
-                    if e.mod * KMOD_CTRL:
-                        self.move_cursor_one_word(self.LEFT)
-                    else:
-                        self.move_cursor_one_letter(self.LEFT)
-
-                elif e.key == K_BACKSPACE:
-                    if self.cursor == 0:
-                        continue
-
-                    if e.mod & KMOD_CTRL:
-                        self.delete_one_word(self.LEFT)
-                    else:
-                        self.delete_one_letter(self.LEFT)
-
-                elif e.key == K_DELETE:
-                    if e.mod & KMOD_CTRL:
-                        self.delete_one_word(self.RIGHT)
-                    else:
-                        self.delete_one_letter(self.RIGHT)
-
-                elif e.unicode != '' and e.unicode.isprintable():
-                    self.add_letter(e.unicode)
+                if e.key == K_v and e.mod & KMOD_CTRL:
+                    typed.append(clipboard_text())
+                    continue
+
+                if e.unicode != '' and e.unicode.isprintable() and not e.mod & KMOD_CTRL:
+                    if not self._text_input:
+                        typed.append(e.unicode)
+                    continue
+
+            # the other events may move the cursor, so the text typed before goes first
+            if typed:
+                self.insert_text(''.join(typed))
+                typed = []
+
+            self._event(e)
+
+        if typed:
+            self.insert_text(''.join(typed))
+
+    def _event(self, e):
+        """Handle an event that is not a typed character: the keys to move the cursor, to delete and the clicks."""
+
+        if e.type == KEYDOWN:
+            if e.key == K_RIGHT:
+                if e.mod & KMOD_CTRL:
+                    self.move_cursor_one_word(self.RIGHT)
+                else:
+                    self.move_cursor_one_letter(self.RIGHT)
+
+            elif e.key == K_LEFT:
+                if e.mod & KMOD_CTRL:
+                    self.move_cursor_one_word(self.LEFT)
+                else:
+                    self.move_cursor_one_letter(self.LEFT)
+
+            elif e.key == K_BACKSPACE:
+                if e.mod & KMOD_CTRL:
+                    self.delete_one_word(self.LEFT)
+                else:
+                    self.delete_one_letter(self.LEFT)
+
+            elif e.key == K_DELETE:
+                if e.mod & KMOD_CTRL:
+                    self.delete_one_word(self.RIGHT)
+                else:
+                    self.delete_one_letter(self.RIGHT)
+
+        elif e.type == MOUSEBUTTONDOWN and e.button == 1 and e.pos in self:
+            self.cursor = self.cursor_at(e.pos[0])
+
+    def _view_range(self):
+        """The first and last characters that can be seen, with a margin."""
+        widths = self._widths()
+        scroll = self._shift()
+
+        first = max(bisect(widths, scroll) - 1 - self.VIEW_MARGIN, 0)
+        last = min(bisect(widths, scroll + self.width) + self.VIEW_MARGIN, len(self))
+        return first, last
 
     def _render(self):
         """
-        Render the text.
+        Render the characters in view.
 
         Avoid using this fonction too many times as it is slow as it is slow to render text and blit it.
         """
 
-        self._last_text = self.text
+        view = self._view_key()
+        first = view[1]
+        self._set('_view', view)
+        self._set('_view_x', self._widths()[first])
 
-        self._surface = self.font.render(self.text, True, self.color, self.bg_color)
-        size = self.width, self._surface.get_height()
-        self.size = size
+        self._surface = self._render_string(self._shown(first, view[2]))
+        self.size = self.width, self.font.get_height()
+
+    def _view_key(self):
+        """What the rendered surface should show: the text version, the characters in view and the font."""
+        first, last = self._view_range()
+        return self._edits, first, last, self._pairs_font
+
+    def needs_redraw(self):
+        return BaseWidget.needs_redraw(self) or self._view != self._view_key()
 
     def render(self, display):
         """Render basicly the text."""
 
-        # to handle changing objects / callable
-        if self.text != self._last_text:
+        if self._view != self._view_key():
             self._render()
 
-        if self.text:
-            papy = self._surface.get_width()
-            if papy <= self.width:
-                display.blit(self._surface, (self.topleft, self.size))
-            else:
-                display.blit(self._surface, (self.topleft, self.size), ((papy - self.w, 0), self.size))
+        if len(self):
+            # the part of the rendered characters in the box
+            x = self._view_x - self._scroll
+            area = pygame.Rect(max(0, -x), 0, self.width - max(0, x), self.height)
+            display.blit(self._surface, (self.left + max(0, x), self.top), area)
 
         else:
             display.blit(self.default_text, (self.topleft, self.size))
@@ -331,7 +689,7 @@ class InLinePassBox(InLineTextBox):
     STRANGE = 42
     DOTS = 69
 
-    def __init__(self, pos, size, color=BLUE, bg_color=None, font=DEFAULT_FONT, anchor='center', default_text='',
+    def __init__(self, pos, size, color=BLUE, bg_color=None, font=None, anchor='center', default_text='',
                  style=DOTS):
         """
         TextBow that doesn't show the text but other thing or some dots. See also InLineTextBox.
@@ -361,7 +719,7 @@ class InLinePassBox(InLineTextBox):
         ]
 
         s = ''
-        while len(s) < len(self.text):
+        while len(s) < len(self):
             apolo = randint(33, 1366)
             for a, b in ranges:
                 if a <= apolo <= b:
@@ -371,57 +729,326 @@ class InLinePassBox(InLineTextBox):
         self._shawn_text = s
         return s
 
-    def cursor_pos(self):
-        """The cursor position in pixels."""
-        if len(self) == 0:
-            return self.left + self.default_text.get_width()
+    def _shown(self, start, stop):
+        if self.style == self.DOTS:
+            return chr(0x2022) * (min(stop, len(self)) - max(start, 0))
+        return self.shawn_text[start:stop]
 
-        papy = self._surface.get_width()
-        if papy > self.w:
-            shift = papy - self.width
-        else:
-            shift = 0
+    def _edited(self, start, removed, inserted):
+        if self.style == self.STRANGE:
+            # all the strange text changes with its length
+            self._set('_advances', None)
+        super()._edited(start, removed, inserted)
 
-        return self.left + self.font.size(self.shawn_text[:self.cursor])[0] - shift
 
-    def _render(self):
+class TextArea(InLineTextBox):
+    """
+    A multi-line textbox, with the editing of InLineTextBox.
+
+    The lines are wrapped to the width of the box and only the rows in view are measured and rendered,
+    so a long text scrolls as fast as a short one.
+    """
+
+    # the number of rows scrolled by the mouse wheel
+    WHEEL_ROWS = 3
+
+    def __init__(self, pos, size, color=BLUE, bg_color=None, font=None, anchor='center', default_text=''):
         """
-        Render the text.
+        Creates a new TextArea object.
 
-        Avoid using this fonction too many times as it is slow as it is slow to render text and blit it.
+        :param pos: the position of the text
+        :param size: the width and height of the box
+        :param color: the color of the text
+        :param bg_color: the background color of the box
+        :param font: a pygame.Font object, DEFAULT_FONT if None
+        :param anchor: the anchor of the box.
+            See http://www.pygame.org/docs/ref/rect.html#pygame.Rect for a list of possible anchors.
         """
 
-        self._last_text = self.shawn_text
+        self._lengths = [0]  # the length of each line, without the line break
+        self._starts = [0]  # the index of the first character of the lines, known only up to an edit
+        self._top = (0, 0)  # the line and the row in this line at the top of the box
+        self._followed = None  # the text and cursor that were last made visible
 
-        self._surface = self.font.render(self.shawn_text, True, self.color, self.bg_color)
-        size = self.w, self._surface.get_height()
+        super().__init__(pos, size[0], color, bg_color, font, anchor, default_text)
         self.size = size
 
-    def render(self, display):
-        """Render basicly the text."""
+    @InLineTextBox.text.setter
+    def text(self, value):
+        """Set the text to a new string."""
+        value = str(value)
+        InLineTextBox.text.fset(self, value)
+        self._set('_lengths', [len(line) for line in value.split('\n')])
+        self._set('_starts', [0])
+        self._top = (0, 0)
 
-        # to handle changing objects / callable
-        if self.shawn_text != self._last_text:
-            self._render()
+    @property
+    def line_count(self):
+        """The number of lines of the text."""
+        return len(self._lengths)
+
+    def _line_start(self, line):
+        """The index of the first character of a line in the text."""
+        starts = self._starts
+        if line >= len(starts):
+            # the starts after an edit are found again only when we need them
+            starts.extend(accumulate(chain([starts[-1] + self._lengths[len(starts) - 1] + 1],
+                                           self._lengths[len(starts):line]),
+                                     lambda start, length: start + length + 1))
+        return starts[line]
+
+    def _line_of(self, index):
+        """The line that contains the character at index in the text."""
+        starts = self._starts
+        step = 64  # the index is usually close to the last edit
+        while starts[-1] <= index and len(starts) < len(self._lengths):
+            self._line_start(min(len(starts) + step, len(self._lengths) - 1))
+            step *= 2
+        return bisect(starts, index) - 1
+
+    def line(self, line):
+        """Return the text of a line."""
+        start = self._line_start(line)
+        return self._buffer[start:start + self._lengths[line]]
+
+    def _replace(self, start, end, string):
+        """Replace the characters from start to end by the string, and update the lengths of the lines."""
+        first, last = self._line_of(start), self._line_of(end)
+        before = start - self._line_start(first)
+        after = self._line_start(last) + self._lengths[last] - end
+
+        lengths = [len(part) for part in string.split('\n')]
+        lengths[0] += before
+        lengths[-1] += after
+        self._lengths[first:last + 1] = lengths
+        del self._starts[first + 1:]
+
+        super()._replace(start, end, string)
+
+    def insert_text(self, text):
+        """
+        Insert a string at the cursor pos, in one edit.
+
+        Tabs become spaces and the other non printable characters, but the line breaks, are dropped.
+        """
+
+        text = text.replace('\r\n', '\n').replace('\r', '\n').replace('\t', ' ')
+        text = ''.join(c for c in text if c.isprintable() or c == '\n')
+        if not text:
+            return
+
+        self._replace(self.cursor, self.cursor, text)
+        self.cursor += len(text)
+
+    # Rows
+
+    def _rows(self, line):
+        """The index of the first character of each row of a wrapped line."""
+        text = self.line(line)
+        if not text:
+            return 0,
+
+        font = self.font
+        return wrap_cache.get_or_create((_font_key(font), self.width, text),
+                                        lambda: wrap_line(font, text, self.width))
+
+    def _next_row(self, row):
+        """The (line, row) after a row, or None for the last one."""
+        line, i = row
+        if i + 1 < len(self._rows(line)):
+            return line, i + 1
+        if line + 1 < self.line_count:
+            return line + 1, 0
+        return None
+
+    def _previous_row(self, row):
+        """The (line, row) before a row, or None for the first one."""
+        line, i = row
+        if i:
+            return line, i - 1
+        if line:
+            return line - 1, len(self._rows(line - 1)) - 1
+        return None
+
+    def _row_text(self, row):
+        """The index of the first character of a row in the text and the text of the row."""
+        line, i = row
+        rows = self._rows(line)
+        text = self.line(line)
+        end = rows[i + 1] if i + 1 < len(rows) else len(text)
+        return self._line_start(line) + rows[i], text[rows[i]:end]
+
+    def _row_of(self, index):
+        """The (line, row) of the character at index in the text."""
+        line = self._line_of(index)
+        return line, bisect(self._rows(line), index - self._line_start(line)) - 1
 
-        if self.text:
-            papy = self._surface.get_width()
-            if papy <= self.width:
-                display.blit(self._surface, (self.topleft, self.size))
+    @property
+    def visible_rows(self):
+        """The number of rows that fit in the box."""
+        return max(1, self.height // self.font.get_height())
+
+    def _visible(self):
+        """The rows in view, from the top."""
+        rows = []
+        row = self._top
+        while row is not None and len(rows) < self.visible_rows:
+            rows.append(row)
+            row = self._next_row(row)
+        return rows
+
+    def scroll(self, rows):
+        """Scroll the text of some rows down (positive) or up."""
+        top = self._top
+        step = self._next_row if rows > 0 else self._previous_row
+        for _ in range(abs(rows)):
+            row = step(top)
+            if row is None:
+                break
+            top = row
+        self._top = top
+
+    def _follow(self):
+        """Scroll to make the cursor visible, when it or the text changed."""
+        if self._followed == (self._edits, self.cursor, self.size):
+            return
+        self._set('_followed', (self._edits, self.cursor, self.size))
+
+        # an edit may have removed the top line
+        if self._top[0] >= self.line_count:
+            self._top = (self.line_count - 1, 0)
+        elif self._top[1] >= len(self._rows(self._top[0])):
+            self._top = (self._top[0], 0)
+
+        cursor = self._row_of(self.cursor)
+        if cursor < self._top:
+            self._top = cursor
+        elif cursor not in self._visible():
+            self._top = cursor
+            self.scroll(1 - self.visible_rows)
+
+    # Cursor
+
+    def _column_at(self, text, x):
+        """The index of the cursor closest to x in a row."""
+        lo, hi = 0, len(text)
+        while lo < hi:
+            mid = (lo + hi + 1) // 2
+            if self.font.size(text[:mid])[0] <= x:
+                lo = mid
             else:
-                display.blit(self._surface, (self.topleft, self.size), ((papy - self.w, 0), self.size))
+                hi = mid - 1
+
+        if lo < len(text) and self.font.size(text[:lo + 1])[0] - x < x - self.font.size(text[:lo])[0]:
+            return lo + 1
+        return lo
+
+    def _index_in_row(self, row, x):
+        """The index of the cursor closest to x (relative to the box) in a row."""
+        start, text = self._row_text(row)
+        column = self._column_at(text, x)
+        if column == len(text) and column and row[1] + 1 < len(self._rows(row[0])):
+            # the end of a wrapped row is the start of the next one
+            column -= 1
+        return start + column
+
+    def cursor_pos(self):
+        """The cursor position in pixels, as (x, y), or None if it is not in view."""
+        self._follow()
+
+        visible = self._visible()
+        row = self._row_of(self.cursor)
+        if row not in visible:
+            return None
+
+        y = self.top + visible.index(row) * self.font.get_height()
+        if len(self) == 0:
+            return self.left + self.default_text.get_width(), y
+
+        start, text = self._row_text(row)
+        return self.left + self.font.size(text[:self.cursor - start])[0], y
+
+    def cursor_at(self, pos):
+        """The index of the cursor closest to the pos on the screen."""
+        self._follow()
+
+        visible = self._visible()
+        i = (pos[1] - self.top) // self.font.get_height()
+        return self._index_in_row(visible[max(0, min(i, len(visible) - 1))], pos[0] - self.left)
+
+    def move_cursor_one_row(self, direction):
+        """Move the cursor one row down (1) or up (-1), keeping its x."""
+        row = self._row_of(self.cursor)
+        start, text = self._row_text(row)
+        x = self.font.size(text[:self.cursor - start])[0]
+
+        row = self._next_row(row) if direction > 0 else self._previous_row(row)
+        if row is not None:
+            self.cursor = self._index_in_row(row, x)
+
+    def _event(self, e):
+        """Handle the keys and clicks of a multi-line text, and pass the others to InLineTextBox."""
+
+        if e.type == KEYDOWN and e.key in (K_RETURN, K_KP_ENTER):
+            self.insert_text('\n')
+
+        elif e.type == KEYDOWN and e.key in (K_UP, K_DOWN):
+            self.move_cursor_one_row(1 if e.key == K_DOWN else -1)
+
+        elif e.type == KEYDOWN and e.key in (K_HOME, K_END):
+            line = self._line_of(self.cursor)
+            self.cursor = self._line_start(line) + (self._lengths[line] if e.key == K_END else 0)
+
+        elif e.type == MOUSEBUTTONDOWN and e.button in (4, 5) and e.pos in self:
+            self.scroll(self.WHEEL_ROWS if e.button == 5 else -self.WHEEL_ROWS)
+
+        elif e.type == MOUSEBUTTONDOWN and e.button == 1 and e.pos in self:
+            self.cursor = self.cursor_at(e.pos)
+
         else:
-            display.blit(self.default_text, (self.topleft, self.size))
+            super()._event(e)
 
-        if self._focus:
-            groom = self.cursor_pos()
-            line(display, (groom, self.top), (groom, self.bottom), CONCRETE)
+    # Drawing
+
+    def _render(self):
+        """The rows are rendered when drawn, and kept in text_cache."""
+
+    def needs_redraw(self):
+        self._follow()
+        return BaseWidget.needs_redraw(self)
+
+    def render(self, display):
+        """Render the rows in view."""
+        self._follow()
+
+        if self.bg_color is not None:
+            display.fill(self.bg_color, self)
+
+        if len(self) == 0:
+            display.blit(self.default_text, self.topleft)
+
+        height = self.font.get_height()
+        area = pygame.Rect(0, 0, self.width, height)
+        for i, row in enumerate(self._visible()):
+            _, text = self._row_text(row)
+            if text:
+                display.blit(self._render_string(text), (self.left, self.top + i * height), area)
+
+        cursor = self.cursor_pos()
+        if self._focus and cursor is not None:
+            x, y = cursor
+            line(display, (x, y), (x, y + height), CONCRETE)
 
 
 class LaText(SimpleText):
-    """This class provides a nice  and slow rendering for maths equations based on latex."""
+    """
+    This class provides a nice rendering for maths equations based on latex.
+
+    The equations are compiled in the background (see GUI.latex), the source is shown meanwhile,
+    or the last equation when the text changes.
+    """
 
-    def __init__(self, text, pos, color=BLUE, bg_color=None, font=DEFAULT_FONT, anchor='center'):
+    def __init__(self, text, pos, color=BLUE, bg_color=None, font=None, anchor='center'):
         """
         The latex _interface_ provides a well looking display of math exquations.
         
@@ -431,66 +1058,71 @@ class LaText(SimpleText):
             LaTex text, without the headers (only the document environement.
         :param pos: the position of the text
         :param color: the color of the text
-        :param font: a pygame.Font object. Its size will be chosent for the LeTeX size.
+        :param font: a pygame.Font object, DEFAULT_FONT if None. Its size will be chosent for the LeTeX size.
             Too big sizes (> 24.88) does not work
         :param anchor: the anchor of the text.
             See http://www.pygame.org/docs/ref/rect.html#pygame.Rect for a list of possible anchors.
         """
 
-        super().__init__(text, pos, color, bg_color, font, anchor)
-
-    @staticmethod
-    def latex_to_img(tex):
-        """Return a pygame image from a latex template."""
-        with tempfile.TemporaryDirectory() as tmpdirname:
-            with open(tmpdirname + r'\tex.tex', 'w') as f:
-                f.write(tex)
-
-            os.system(r"latex {0}\tex.tex -halt-on-error -interaction=batchmode -disable-installer -aux-directory={0} "
-                      r"-output-directory={0}".format(tmpdirname))
-            os.system(r"dvipng -T tight -z 9 --truecolor -o {0}\tex.png {0}\tex.dvi".format(tmpdirname))
-            # os.system(r'latex2png ' + tmpdirname)
+        self._job = None  # the future of the image being compiled
+        self._compiled = False  # whether the surface is an equation or the placeholder
+        self.error = None  # the LatexError of the last equation, if it failed
 
-            image = pygame.image.load(tmpdirname + r'\tex.png')
+        super().__init__(text, pos, color, bg_color, font, anchor)
 
-        return image
+    def page(self):
+        """The LaTeX of the equation, in the color and size of the widget."""
+        size = getattr(self.font, 'font_size', None) or self.font.get_height()
+        return latex.equation_page(self.text, self.color, size)
 
     def _render(self):
-        # TODO : transparent background
         self._last_text = self.text
 
-        name = GUI_PATH + '/.temp/matheq' + str(id(self)) + '.png'
+        job = latex.request(self.page())
+        self._set('_job', job)
+
+        if job.done():
+            self._show()
+        elif not self._compiled:
+            # the source is better than nothing while it compiles
+            self._surface = self._render_string(self.text)
+            self.size = self._surface.get_size()
 
-        # generates the LaTeX text
-        preamble = r"""\documentclass[40pt]{article}\pagestyle{empty}""" + \
-                   r"\usepackage{color}" + \
-                   r"\usepackage{amsmath}" + \
-                   r"\usepackage{amsfonts}" + \
-                   r"\definecolor{kkolor}{RGB}{%i, %i, %i}" % self.color + \
-                   r"\begin{document}"
+    def _show(self):
+        """Show the image of the finished job."""
+        job = self._job
+        self._set('_job', None)
 
-        print(self.font)
-        font_setter = r"\fontsize{%i pt}{%i pt}\selectfont" % (self.font.font_size, self.font.font_size * 1.2)
-        color_setter = r"{\color{kkolor}"
-        end_color_setter = '}'
-        end = r'\end{document}'
-        text = preamble + font_setter + color_setter + self.text + end_color_setter + end
+        try:
+            surface = job.result()
+        except latex.LatexError as e:
+            self.error = e
+            return
 
-        # generates the LaTeX png
-        self._surface = self.latex_to_img(text)
+        self.error = None
+        self._compiled = True
+        self._surface = surface
+        self.size = surface.get_size()
 
-        # load it
-        rect = self._surface.get_rect()
+    def needs_redraw(self):
+        # the equations requested since the last frame are compiled together
+        latex.flush()
+        return super().needs_redraw() or self._job is not None and self._job.done()
 
-        self.size = rect.size
+    def render(self, display):
+        """Render the equation, or the placeholder while it compiles."""
+        if self.text != self._last_text:
+            self._render()
+        latex.flush()
 
-        try:
-            os.remove(name)
-        except FileNotFoundError:
-            pass
+        if self._job is not None and self._job.done():
+            self._show()
+
+        display.blit(self._surface, (self.topleft, self.size))
 
 
-__all__ = ['SimpleText', 'LaText', 'InLineTextBox', 'InLinePassBox']
+__all__ = ['SimpleText', 'LaText', 'InLineTextBox', 'InLinePassBox', 'TextSource', 'render_string', 'text_cache',
+           'clipboard_text', 'TextArea', 'wrap_line', 'wrap_cache']
 
 if __name__ == '__main__':
     from GUI.gui_examples.text import gui
@@ -10,14 +10,22 @@ import pygame
 from pygame.locals import *
 from collections import defaultdict
 
-from GUI.base import BaseWidget
+from GUI.base import BaseWidget, new_frame, focused_widgets
+from GUI.math import coalesce_rects
+from GUI.reactive import modifier
+from GUI.spatial import SpatialIndex
 from GUI.locals import FLASH_GREEN, MIDNIGHT_BLUE, TOPLEFT, WHITE, BLUE
-from GUI.text import SimpleText
+from GUI.text import SimpleText, TextSource
+
+POINTER_EVENTS = (MOUSEMOTION, MOUSEBUTTONDOWN, MOUSEBUTTONUP)
 
 
 class FPSIndicator(SimpleText):
     """A small text on the top right corner of the screen showing the fps."""
 
+    # the minimum number of seconds between two updates of the text
+    INTERVAL = 0.2
+
     def __init__(self, clock: pygame.time.Clock):
         """A widget to indicate the FPS on the topleft corner of the screen.
 
@@ -25,7 +33,8 @@ class FPSIndicator(SimpleText):
         """
         self.clock = clock
 
-        super().__init__(self.get_fps_text, (0, 0), FLASH_GREEN, MIDNIGHT_BLUE, anchor=TOPLEFT)
+        source = TextSource(self.get_fps_text, self.INTERVAL)
+        super().__init__(source, (0, 0), FLASH_GREEN, MIDNIGHT_BLUE, anchor=TOPLEFT)
 
     def get_fps_text(self):
         """Retruna string representing the fps."""
@@ -194,9 +203,18 @@ class Window:
         Don't forget to call super() on those methods
 
     class variable to customise the project : FPS, VIDEO_OPTION, SCREEN_SIZE, NAME, EVENT_ALLOWED
+
+    SCREEN_SIZE is a modifier, so the widgets with a computed pos or size that depends on it are updated
+    when the window is resized.
+
+    The widgets are kept in a grid of GRID_SIZE pixels, so the pointer events are only sent to the widgets
+    under the pointer, the focused ones and the ones that were hovered or pressed by the previous pointer event.
+
+    With DIRTY_RECTS, only the parts of the screen where a widget changed are drawn again and sent to the display.
+    If you draw other things in render(), call damage() with the rects you changed.
     """
 
-    SCREEN_SIZE = 800, 500
+    SCREEN_SIZE = modifier((800, 500))
     NAME = 'Empty project'
     VIDEO_OPTIONS = VIDEORESIZE
     EVENT_ALLOWED = (QUIT, ACTIVEEVENT, KEYDOWN, KEYUP, MOUSEMOTION, MOUSEBUTTONUP, MOUSEBUTTONDOWN,
@@ -206,6 +224,9 @@ class Window:
     SHOW_FPS = False
     BACKGROUND_COLOR = WHITE
     BORDER_COLOR = BLUE
+    GRID_SIZE = 64
+    DIRTY_RECTS = False
+    DIRTY_MARGIN = 4  # widgets can draw a bit outside their rect, like shadows
 
     def __init__(self):
         """
@@ -222,9 +243,24 @@ class Window:
         self.screen = self.new_screen()
         self.clock = pygame.time.Clock()
         self._widgets = []
+        self._conditions = {}
+        self._index = SpatialIndex(self.GRID_SIZE)
+        self._hovered = []
+        self._grabbed = []
+        self._drawn = {}  # id(widget) -> rect where it was drawn
+        self._damaged = []  # rects to redraw
+        self._full_redraw = True
 
         self.fps = FPSIndicator(self.clock)
 
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+
+        # keep SCREEN_SIZE observable when a subclass overrides it
+        size = cls.__dict__.get('SCREEN_SIZE')
+        if size is not None and not isinstance(size, modifier):
+            cls.SCREEN_SIZE = modifier(size, 'SCREEN_SIZE')
+
     def add(self, widget, condition=lambda: 42):
         """
         Add a widget to the widows.
@@ -236,6 +272,8 @@ class Window:
         assert callable(condition)
         assert isinstance(widget, BaseWidget)
         self._widgets.append((widget, condition))
+        self._conditions[id(widget)] = condition
+        self._index.add(widget)
 
         return widget
 
@@ -244,10 +282,30 @@ class Window:
         for i, (wid, _) in enumerate(self._widgets):
             if widget is wid:
                 del self._widgets[i]
+                del self._conditions[id(widget)]
+                self._index.remove(widget)
+                self.damage(self._drawn.pop(id(widget), None))
+                self._hovered = [w for w in self._hovered if w is not widget]
+                self._grabbed = [w for w in self._grabbed if w is not widget]
                 return True
 
         raise ValueError('Widget not in list')
 
+    def damage(self, rect):
+        """Tell that a part of the screen must be drawn again. Only useful with DIRTY_RECTS."""
+        if self.DIRTY_RECTS and rect is not None:
+            self._damaged.append(pygame.Rect(rect))
+
+    def widgets_at(self, point):
+        """Return the active widgets that contains the point, from the bottom to the top."""
+        self._index.update()
+        return [wid for wid in self._index.at(point) if self._conditions[id(wid)]()]
+
+    def widgets_in(self, rect):
+        """Return the active widgets that overlap the rect, from the bottom to the top."""
+        self._index.update()
+        return [wid for wid in self._index.colliding(rect) if self._conditions[id(wid)]()]
+
     def update_on_event(self, e):
         """Process a single event."""
         if e.type == QUIT:
@@ -263,19 +321,67 @@ class Window:
         elif e.type == VIDEORESIZE:
             self.SCREEN_SIZE = e.size
             self.screen = self.new_screen()
+            self._full_redraw = True
+            # widgets may depend on the screen size
+            new_frame()
 
     def update(self):
         """Get all events and process them by calling update_on_event()"""
+        new_frame()
+
         events = pygame.event.get()
         for e in events:
             self.update_on_event(e)
 
+        self._index.update()
+        self.dispatch(events)
+
+    def dispatch(self, events):
+        """
+        Send the events to the widgets.
+
+        Every active widget is updated once per frame, even without events, so it can animate or poll the mouse.
+        The pointer events are only given to the widgets that may care about them, the other events to every widget.
+        """
+
+        pointer = {}  # id(widget) -> ids of the pointer events it receives
+        for e in events:
+            if e.type in POINTER_EVENTS:
+                for wid in self._pointer_targets(e):
+                    pointer.setdefault(id(wid), set()).add(id(e))
+
+        others = [e for e in events if e.type not in POINTER_EVENTS]
         for wid, cond in self._widgets:
             if cond():
-                wid.update(events)
+                received = pointer.get(id(wid))
+                if received is None:
+                    wid.update(others[:])
+                else:
+                    wid.update([e for e in events if e.type not in POINTER_EVENTS or id(e) in received])
+
+    def _pointer_targets(self, e):
+        """The widgets that must receive a pointer event."""
+        under = self._index.at(e.pos)
+
+        targets = {id(wid): wid for wid in under + self._hovered + self._grabbed}
+        for wid in focused_widgets():
+            if wid in self._index:
+                targets[id(wid)] = wid
+
+        self._hovered = under
+        if e.type == MOUSEBUTTONDOWN:
+            self._grabbed = under
+        elif e.type == MOUSEBUTTONUP:
+            self._grabbed = []
+
+        return targets.values()
 
     def render(self):
         """Render the screen. Here you must draw everything."""
+        if self.DIRTY_RECTS and not self._full_redraw:
+            self._render_damaged()
+            return
+
         self.screen.fill(self.BACKGROUND_COLOR)
 
         for wid, cond in self._widgets:
@@ -288,11 +394,68 @@ class Window:
         if self.SHOW_FPS:
             self.fps.render(self.screen)
 
+        if self.DIRTY_RECTS:
+            self._full_redraw = False
+            self._collect_damage()
+            self._damaged = [self.screen.get_rect()]
+            for wid, _ in self._widgets:
+                wid._needs_redraw = False
+
+    def _collect_damage(self):
+        """Find the parts of the screen where a widget moved, appeared, disappeared or changed."""
+        margin = 2 * self.DIRTY_MARGIN
+        for wid, cond in self._widgets:
+            last_rect = self._drawn.get(id(wid))
+            if cond():
+                rect = pygame.Rect(wid.topleft, wid.size).inflate(margin, margin)
+                if rect == last_rect and not wid.needs_redraw():
+                    continue
+            else:
+                rect = None
+                if last_rect is None:
+                    continue
+
+            self.damage(last_rect)
+            self.damage(rect)
+            self._drawn[id(wid)] = rect
+
+    def _render_damaged(self):
+        """Draw only the damaged parts of the screen."""
+        self._index.update()
+        self._collect_damage()
+        self._damaged = coalesce_rects(self._damaged)
+
+        margin = 2 * self.DIRTY_MARGIN
+        drawn = {}
+        for rect in self._damaged:
+            self.screen.set_clip(rect)
+            self.screen.fill(self.BACKGROUND_COLOR, rect)
+
+            for wid in self._index.colliding(rect.inflate(margin, margin)):
+                if self._conditions[id(wid)]():
+                    wid.render(self.screen)
+                    drawn[id(wid)] = wid
+
+            if self.BORDER_COLOR is not None:
+                pygame.draw.rect(self.screen, self.BORDER_COLOR, ((0, 0), self.SCREEN_SIZE), 1)
+
+        self.screen.set_clip(None)
+
+        for wid in drawn.values():
+            wid._needs_redraw = False
+
+        if self.SHOW_FPS:
+            self.damage(self.fps.render(self.screen))
 
     def update_screen(self):
         """Refresh the screen. You don't need to override this except to update only small portins of the screen."""
         self.clock.tick(self.FPS)
-        pygame.display.update()
+
+        if self.DIRTY_RECTS:
+            pygame.display.update(self._damaged)
+            self._damaged = []
+        else:
+            pygame.display.update()
 
     # noinspection PyMethodMayBeStatic
     def destroy(self):